@@ -1,35 +1,274 @@
-from typing import Union, List, Set
-from pandas.core.frame import DataFrame
+from typing import Union, List, Set, Iterator
 from selenium import webdriver
 from time import sleep
-import urllib.request
+import urllib.parse
 import os
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC 
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import json
+import sqlite3
+import time
+import copy
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 
 from sqlalchemy.engine.base import Engine
 # from webdriver_manager.chrome import ChromeDriverManager
 import boto3 
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from tqdm import tqdm
 import shutil
+import io
+from datetime import datetime, timezone
+import codecs
+import itertools
+import tempfile
 import uuid
 import re
-import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, MetaData, Table, Column, Text, Boolean, Integer, BigInteger, ForeignKey
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as StreamError
+from bs4 import BeautifulSoup
+# pyarrow is only needed for the Parquet output.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Script run in the browser to collect the hrefs of grid items which have not been seen yet.
+# Every anchor it reads is marked with a data-scraped attribute so the next call skips it, which keeps the cost
+# of each scroll proportional to the number of newly loaded pins rather than to the size of the whole grid.
+HARVEST_LINKS_SCRIPT = '''
+    const container = document.evaluate(arguments[0], document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!container) {
+        return null;
+    }
+    const anchors = document.evaluate(arguments[1], container, null,
+        XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const hrefs = [];
+    for (let i = 0; i < anchors.snapshotLength; i++) {
+        const anchor = anchors.snapshotItem(i);
+        if (anchor.hasAttribute('data-scraped')) {
+            continue;
+        }
+        anchor.setAttribute('data-scraped', '1');
+        hrefs.push(anchor.href);
+    }
+    return hrefs;
+'''
+
+# Script run in the browser to grab every field of an image page in one call. It takes the xpath dictionary of the
+# scraper, works out the page layout the same way as _grab_all_users_and_counts and returns a single object with
+# the title, description, poster, follower count, tags, media type and src. 'ready' is false while the media
+# element of the page has not loaded yet.
+EXTRACT_PIN_SCRIPT = '''
+    const xpaths = arguments[0];
+    const first = (xpath, context) => document.evaluate(xpath, context || document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const all = (xpath, context) => {
+        const result = document.evaluate(xpath, context || document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+        return nodes;
+    };
+    const pin = {};
+    let userContainer, userElement, tagContainer;
+    if (first(xpaths.official_user_container)) {
+        pin.layout = 'official';
+        userContainer = xpaths.official_user_container;
+        userElement = xpaths.official_user_element;
+        tagContainer = xpaths.tag_container;
+    } else if (first(xpaths.close_up_details)) {
+        pin.layout = 'non_official';
+        userContainer = xpaths.non_off_user_container;
+        userElement = xpaths.non_off_user_element;
+        tagContainer = xpaths.tag_container;
+    } else {
+        pin.layout = 'story';
+        userContainer = xpaths.non_off_user_container;
+        userElement = xpaths.non_off_user_element;
+        tagContainer = xpaths.story_tag_container;
+    }
+    const story = pin.layout === 'story';
+
+    const title = first(story ? xpaths.h1_title_element : xpaths.reg_title_element);
+    pin.title = title ? title.textContent : 'No Title Data Available';
+
+    if (story) {
+        pin.description = 'No description available Story format';
+    } else {
+        const descContainer = first(xpaths.desc_container);
+        const description = descContainer && first(xpaths.desc_element, descContainer);
+        pin.description = description ? description.textContent : 'No description available';
+    }
+
+    const user = first(userContainer);
+    const poster = user && first(userElement, user);
+    pin.poster_name = poster ? poster.textContent : 'User Info Error';
+    const profile = poster && (poster.closest('a[href]') || user.querySelector('a[href]'));
+    pin.poster_href = profile ? profile.getAttribute('href') : null;
+    const followers = user ? all(xpaths.follower_element, user) : [];
+    if (!poster || followers.length === 0) {
+        pin.follower_count = 'User Info Error';
+    } else {
+        const count = followers[followers.length - 1].textContent.trim();
+        pin.follower_count = count === '' ? '0' : count.split(/\\s+/)[0];
+    }
+
+    const tags = first(tagContainer + xpaths.tag_vase_carousel);
+    pin.tag_list = tags ? all(xpaths.tag_link, tags).map(tag => tag.textContent) : 'No Tags Available';
+
+    if (!story) {
+        const image = first(xpaths.pin_closeup_image);
+        const video = image ? null : first('//video');
+        if (image) {
+            pin.is_image_or_video = 'image';
+            pin.image_src = image.src;
+        } else if (video) {
+            pin.is_image_or_video = 'video';
+            pin.image_src = video.poster;
+        }
+    } else {
+        const storyImage = first(xpaths.story_pin_image);
+        if (storyImage) {
+            const style = storyImage.getAttribute('style');
+            if (!style) {
+                const video = first(xpaths.story_pin_video);
+                pin.is_image_or_video = 'video(story page format)';
+                pin.image_src = video ? video.poster : null;
+            } else {
+                pin.is_image_or_video = 'image(story page format)';
+                pin.image_src = style.split('"')[1];
+            }
+        } else {
+            const video = first(xpaths.story_pin_multi_video);
+            if (video) {
+                pin.is_image_or_video = 'multi-video(story page format)';
+                pin.image_src = video.poster;
+            }
+        }
+    }
+    pin.ready = Boolean(pin.image_src);
+    return pin;
+'''
+
+# Headers sent with every page request in 'http' extraction mode, so that Pinterest serves the same page as to a browser.
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36',
+    'Accept-Language': 'en-GB,en;q=0.9'
+}
+
+# Script run in the browser to grab the text of the page state JSON which Pinterest embeds in every page.
+PAGE_STATE_SCRIPT = '''
+    const state = document.getElementById('__PWS_DATA__') || document.getElementById('initial-state');
+    return state ? state.textContent : null;
+'''
+
+# URL patterns the browser is not allowed to load in lean mode. Images are downloaded separately by _download_image
+# and their src is still in the page, so only the DOM and the scripts building it are needed.
+LEAN_BLOCKED_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.mp4', '*.m3u8', '*.m4s', '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*i.pinimg.com*', '*v.pinimg.com*', '*ct.pinterest.com*', '*log.pinterest.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*'
+]
+
+# Number of times in a row the browser of a page worker is restarted after crashing before the worker gives up.
+MAX_BROWSER_RESTARTS = 3
+
+# Record fields which must be present in a pin captured from the network for its image page not to be visited.
+CAPTURED_REQUIRED_FIELDS = ['poster_name', 'follower_count', 'image_src']
+
+# Namespace of the record ids, which are derived from the pin id so that a pin always gets the same id.
+PIN_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'https://www.pinterest.com/pin/')
+
+# Columns of the RDS table of a category, besides its unique_id primary key.
+RDS_COLUMNS = [
+    'name', 'title', 'description', 'poster_name', 'follower_count', 'tag_list', 'is_image_or_video', 'image_src',
+    'image_srcs', 'video_srcs', 'downloaded', 'save_location', 'categories', 'duplicate_of'
+]
+
+# Number of rows upserted into an RDS table per transaction.
+RDS_BATCH_SIZE = 1000
+
+# Multipliers of the suffixes of the follower counts shown by Pinterest.
+FOLLOWER_MULTIPLIERS = {'': 1, 'k': 10**3, 'm': 10**6, 'b': 10**9}
+
+# Number of rows from which an upsert goes through COPY and a staging table rather than INSERT statements.
+RDS_COPY_MIN_ROWS = 10000
+
+# Number of characters read at a time from a json file when it is loaded into an RDS.
+JSON_CHUNK_SIZE = 1 << 16
+
+# Whitespace skipped between the values of a json file being parsed.
+JSON_WHITESPACE = re.compile(r'\s*')
+
+# Number of records per row group of the Parquet files.
+PARQUET_BATCH_SIZE = 10000
+
+# Number of bytes in a megabyte, for the sizes of the S3 transfers.
+MB = 1024 ** 2
+
+# Largest number of keys S3 deletes in a single delete_objects request.
+S3_DELETE_BATCH = 1000
+
+# Number of low bits of a page key holding the category id, the pin id is kept in the bits above.
+CATEGORY_ID_BITS = 16
+
+# Placeholder values left in a record when a field could not be grabbed from the image page.
+PLACEHOLDER_VALUES = ['No Title Data Available', 'No description available', 'User Info Error', 'No Tags Available']
 
 ''' Defines a class to perform webscraping for the pinterest website. '''
 
 class PinterestScraper:
 
-    def __init__(self, root: str) -> None:
+    def __init__(self, root: str, n_workers: int = os.cpu_count(), target_pins: Union[int, None] = None,
+                scroll_patience: int = 3, scroll_timeout: float = 3, extraction_mode: str = 'script',
+                capture_network: bool = False, lean_browser: bool = False, page_load_timeout: float = 30,
+                download_workers: int = 8, downloads_per_host: int = 4, fsync_every: int = 50,
+                parquet_output: bool = True, upload_workers: int = 16, multipart_threshold_mb: int = 8,
+                s3_max_attempts: int = 5, s3_endpoint_url: Union[str, None] = None) -> None:
         
         ''' Initialise the attributes of the class
 
             Arguments
             ---------
-            root: str (The main page which contains a list of all the available categories.) 
+            root: str (The main page which contains a list of all the available categories.) \n
+            n_workers: int (The number of browsers used to scrape image pages in parallel. Defaults to the core count.) \n
+            target_pins: Union[int, None] (If given, scroll each category until this many new pins are found instead of \
+            asking for a number of scrolls.) \n
+            scroll_patience: int (The number of scrolls in a row without new pins after which a category is considered exhausted.) \n
+            scroll_timeout: float (The maximum number of seconds to wait for new pins to load after each scroll.) \n
+            extraction_mode: str ('script' to grab all fields of an image page with one browser call, \
+            'state' to read them from the page state JSON, 'xpath' to grab them field by field, \
+            'http' to fetch image pages without a browser.) \n
+            capture_network: bool (Whether to grab pin data from the network responses of category pages while scrolling.) \n
+            lean_browser: bool (Whether browsers should skip images, media, fonts and analytics and stop waiting for a page \
+            once its DOM is ready.) \n
+            page_load_timeout: float (The maximum number of seconds a browser waits for a page to load.) \n
+            download_workers: int (The number of images downloaded in the background at the same time.) \n
+            downloads_per_host: int (The maximum number of images downloaded from the same host at the same time.) \n
+            fsync_every: int (The number of records written to the segment files between two syncs to disk. \
+            A checkpoint of the run is written at every sync.) \n
+            parquet_output: bool (Whether the records of each run are also written to Parquet files, if pyarrow is installed.) \n
+            upload_workers: int (The number of files, or parts of large files, uploaded to S3 at the same time.) \n
+            multipart_threshold_mb: int (The size in MB from which a file is uploaded to S3 in parts, and the size of a part.) \n
+            s3_max_attempts: int (The maximum number of attempts of an S3 request before giving up.) \n
+            s3_endpoint_url: Union[str, None] (The endpoint of an S3 compatible service to use instead of AWS S3, e.g. a local \
+            MinIO server for testing.)
 
             Attributes
             ---------
@@ -37,7 +276,11 @@ class PinterestScraper:
             root: str \n
             driver: webdriver object \n
             link_set: set \n
-            log: set \n
+            visited_db: sqlite3.Connection \n
+            category_ids: dict \n
+            category_names: dict \n
+            duplicate_pages: dict \n
+            reset_categories: list \n
             s3_list: list \n
             current_dict: dict \n
             main_dict: dict \n
@@ -45,6 +288,42 @@ class PinterestScraper:
             cat_imgs_to_save: dict \n
             s3_client: boto3.client(s3) \n
             xpath_dict: dict \n 
+            n_workers: int \n
+            lock: threading.Lock \n
+            stop_workers: threading.Event \n
+            normalized_tables: dict \n
+            target_pins: Union[int, None] \n
+            scroll_patience: int \n
+            scroll_timeout: float \n
+            extraction_mode: str \n
+            session: requests.Session \n
+            capture_network: bool \n
+            captured_pins: dict \n
+            pending_responses: set \n
+            lean_browser: bool \n
+            page_load_timeout: float \n
+            download_pool: ThreadPoolExecutor \n
+            download_slots: threading.BoundedSemaphore \n
+            host_slots: dict \n
+            pending_downloads: set \n
+            current_download: Union[Future, None] \n
+            current_pin_id: Union[int, None] \n
+            segment_files: dict \n
+            fsync_every: int \n
+            parquet_output: bool \n
+            s3_endpoint_url: Union[str, None] \n
+            s3_config: botocore.config.Config \n
+            transfer_config: boto3.s3.transfer.TransferConfig \n
+            upload_manager: Union[s3transfer.manager.TransferManager, None] \n
+            background_uploads: dict \n
+            segment_uploads: dict \n
+            uploaded_segments: dict \n
+            unsynced_records: int \n
+            checkpoint: Union[dict, None] \n
+            run_visited: list \n
+            completed_downloads: list \n
+            harvested: bool \n
+            fresh: Union[str, None] \n
 
             Returns
             ---------
@@ -53,16 +332,31 @@ class PinterestScraper:
         
         self._category = None # Holds the value whatever category we are currently on.
         self._root = root # The root URL.
-        self._driver = webdriver.Chrome()
-        # self._driver = webdriver.Chrome(ChromeDriverManager().install())
-        self._link_set = set() # A set to store previously visited pages' hrefs.
-        self._log = set() # A set used to load previously visisted pages' hrefs upon a rerun.
+        self._link_set = set() # A set of the keys (pin id and category id packed in an int) of pages grabbed on this run which have not been visited before.
+        self._visited_db = None # Connection to the log of pages visited on previous runs (../data/log.db).
+        self._category_ids = {} # The id of every category in the visited log, by name.
+        self._category_names = {} # The name of every category in the visited log, by id.
+        self._duplicate_pages = {} # The other pages of pins found in more than one category, by the key of the page visited.
+        self._reset_categories = [] # Categories whose previous data is being replaced, their visited pages are forgotten.
         self._s3_list = [] # A list used to store the names of categories which are to be saved to an s3 bucket.
         self._current_dict = {} # A dictionary to store data for each individual image page.
-        self._main_dict = {} # A dictionary to store data for entire categories.
+        self._main_dict = {} # A dictionary to store messages about the data of each category.
+        self._appended_saves = [] # Categories whose previous save is carried on, its records are copied into the new json.
         self._counter_dict = {} # A dictionary to define the start point for each category on subsequent runs.
         self._cat_imgs_to_save = {} # A dictionary which store which categories to download images for on a given run.
-        self._s3_client = boto3.client('s3') # S3 client to connect to AWS S3.
+        self._s3_endpoint_url = s3_endpoint_url # The endpoint of the S3 service, None for AWS S3.
+        # Retry policy and connection pool of the S3 clients, one connection per upload thread.
+        self._s3_config = Config(
+            retries={'max_attempts': s3_max_attempts, 'mode': 'standard'},
+            max_pool_connections=max(10, upload_workers)
+        )
+        self._s3_client = boto3.client('s3', endpoint_url=s3_endpoint_url, config=self._s3_config) # S3 client to connect to AWS S3.
+        # How files are uploaded to S3: how many threads and from which size in parts.
+        self._transfer_config = TransferConfig(
+            max_concurrency=upload_workers,
+            multipart_threshold=multipart_threshold_mb * MB,
+            multipart_chunksize=multipart_threshold_mb * MB
+        )
         self._xpath_dict = { # A dictionary to store xpaths to various page elements.
             'official_user_container': '//div[@data-test-id="official-user-attribution"]',
             'official_user_element': './/div[@class="tBJ dyH iFc yTZ pBj zDA IZT mWe CKL"]',
@@ -86,8 +380,133 @@ class PinterestScraper:
             'story_pin_multi_video': '//div[@data-test-id="story-pin-closeup"]//video',
             'close_up_details': '//div[@data-test-id="CloseupDetails"]'
         }
+        self._n_workers = max(1, n_workers or 1) # The number of browsers scraping image pages at the same time.
+        self._lock = threading.Lock() # A lock guarding the dictionaries shared between page workers.
+        self._stop_workers = threading.Event() # An event telling page workers to stop after their current page.
+        self._normalized_tables = {} # The normalized RDS tables shared by all categories, by name.
+        self._current_key = None # The key of the page currently being scraped, i.e. {category}_{number}.
+        self._current_pin_id = None # The pin id of the page currently being scraped.
+        self._target_pins = target_pins # The number of new pins to harvest per category, None to use a number of scrolls.
+        self._scroll_patience = scroll_patience # Scrolls in a row without new pins before a category counts as exhausted.
+        self._scroll_timeout = scroll_timeout # Seconds to wait for the grid to grow after a scroll.
+        self._extraction_mode = extraction_mode # How the data of each image page is grabbed, 'script', 'state', 'xpath' or 'http'.
+        self._download_workers = max(1, download_workers) # The number of images downloaded at the same time.
+        self._downloads_per_host = max(1, downloads_per_host) # The number of images downloaded from one host at the same time.
+        self._session = self._create_session() # Pooled HTTP session used to fetch images, and image pages in 'http' mode.
+        self._download_pool = ThreadPoolExecutor(max_workers=self._download_workers) # Threads downloading images.
+        # Limits the number of queued downloads so that scraping can not run too far ahead of the downloads.
+        self._download_slots = threading.BoundedSemaphore(self._download_workers * 4)
+        self._host_slots = {} # A dictionary of semaphores limiting the concurrent downloads from each host.
+        self._pending_downloads = set() # The downloads which have not finished yet.
+        self._pending_records = set() # The records waiting for their image download to finish before being stored.
+        self._current_download = None # The download queued for the page currently being scraped, if any.
+        self._segment_files = {} # A dictionary of the open segment file each category's records are appended to.
+        self._fsync_every = max(1, fsync_every) # Records written between two syncs of the segment files to disk.
+        self._parquet_output = parquet_output # Whether the records of each run are also written to Parquet files.
+        if parquet_output and pa is None:
+            print('\npyarrow is not installed, the records will not be written to Parquet files. ')
+            self._parquet_output = False
+        # The date the run was started on, which the Parquet files of the run are partitioned by.
+        self._run_date = datetime.now(timezone.utc).date().isoformat()
+        self._checkpoint = None # The checkpoint of a stopped run which the current run resumes, if any.
+        self._run_visited = [] # The keys of the pages whose records have been written on this run.
+        self._completed_downloads = [] # The file names of the images downloaded on this run.
+        # The counters of the run. They are kept in a dictionary as the page workers are shallow copies of the scraper,
+        # an int attribute increased by a worker would only be increased on that worker.
+        self._run_counters = {
+            'unsynced_records': 0, # Records written since the segment files were last synced to disk.
+            'journal_offset': None, # The size of the checkpoint journal when the last checkpoint was written.
+            'journaled_visits': 0, # The number of pages scraped on this run which are in the checkpoint journal.
+            'journaled_downloads': 0, # The number of images downloaded on this run which are in the checkpoint journal.
+            'checkpointed_links': 0, # The number of hrefs grabbed on this run which are in the checkpoint frontier file.
+            'streamed_images': 0 # The images streamed straight to the S3 bucket on this run.
+        }
+        self._upload_manager = None # The transfer manager uploading files to S3 in the background.
+        self._segment_uploads = {} # The segment part being uploaded for each category, with the offset it ends at.
+        self._uploaded_segments = {} # The offset up to which the segment of each category has been uploaded.
+        self._harvested = False # Whether the hrefs of every category have been grabbed on this run.
+        self._fresh = None # The answer given about adding to existing data, kept for the checkpoint.
+        self._capture_network = capture_network # Whether pin data is grabbed from network responses during scrolling.
+        self._captured_pins = {} # A dictionary of record fields captured from the network, keyed by pin id.
+        self._pending_responses = set() # Ids of feed requests whose response body has not finished loading yet.
+        self._lean_browser = lean_browser # Whether browsers skip images, media, fonts and analytics.
+        self._page_load_timeout = page_load_timeout # Seconds a browser waits for a page to load.
+        self._driver = self._create_driver(self._capture_network)
+
+        self._get(self._root) # Opens the root URL.
+
+    def _create_driver(self, capture_network: bool = False) -> webdriver.Chrome:
+
+        ''' Defines a function which creates a new Chrome webdriver. Used for the main driver and for every
+        page worker when image pages are scraped in parallel.
+
+        Arguments
+        ---------
+        capture_network: bool (Whether the browser keeps a log of its network events, only needed for scrolling.)
+
+        Returns
+        ---------
+        webdriver.Chrome (A new browser instance.) '''
+
+        chrome_options = webdriver.ChromeOptions()
+        # Keep the network events of the DevTools protocol so that feed responses can be read while scrolling.
+        if capture_network:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        if self._lean_browser:
+            # Hand the page back as soon as the DOM is ready instead of after every image and script has loaded.
+            chrome_options.set_capability('pageLoadStrategy', 'eager')
+            # Do not render images.
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(self._page_load_timeout)
+        if self._lean_browser:
+            # Stop the browser from downloading images, media, fonts and analytics at all.
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+        return driver
+        # return webdriver.Chrome(ChromeDriverManager().install())
+
+    def _get(self, url: str) -> None:
+
+        ''' Defines a function which opens a page in the browser. If the page is too slow to finish loading within
+        page_load_timeout, the loading is stopped and the scraper carries on with what has loaded so far.
+
+        Arguments
+        ---------
+        url: str (The URL of the page.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            self._driver.get(url)
+        except TimeoutException:
+            self._driver.execute_script('window.stop();')
 
-        self._driver.get(self._root) # Opens the root URL.
+    def _create_session(self) -> requests.Session:
+
+        ''' Defines a function which creates the HTTP session used to download images and to fetch image pages without
+        a browser. The connection pool is sized so that every page worker and download thread can keep its own connection open.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        requests.Session (A session with retries and a connection pool.) '''
+
+        session = requests.Session()
+        session.headers.update(HTTP_HEADERS)
+        # Retry on rate limiting and server errors with an increasing wait between attempts.
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, self._n_workers + self._download_workers),
+                            max_retries=retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
 
     def _get_category_links(self, categories_xpath: str) -> dict:
         
@@ -481,7 +900,17 @@ your data/images to a remote bucket? Y or N: ').upper()
                 # Initialises a key with an empty dictionary value for each category in the current run for the main dictionary.
                 self._main_dict[f"{category}"] = {}
                 # Makes a temporary storage folder for every category in the current run.
-                os.makedirs(f'{self._root_save_path}/temp_{category}')
+                temp_path = f'{self._root_save_path}/temp_{category}'
+                # When resuming a stopped run keep the images it downloaded, except any it was still writing.
+                if self._checkpoint and os.path.exists(temp_path):
+                    for file in os.listdir(temp_path):
+                        if file not in self._checkpoint['downloads']:
+                            os.remove(f'{temp_path}/{file}')
+                    continue
+                # A temp folder left behind by a run that was not resumed is out of date.
+                if os.path.exists(temp_path):
+                    shutil.rmtree(temp_path)
+                os.makedirs(temp_path)
         except KeyboardInterrupt:
             raise KeyboardInterrupt
             
@@ -507,6 +936,295 @@ your data/images to a remote bucket? Y or N: ').upper()
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
+    def _open_visited_log(self) -> None:
+
+        ''' Defines a function which opens the log of pages visited on previous runs. The log is an SQLite database with a
+        row per (category id, pin id) and a table giving every category a small integer id, so checking whether a page has
+        been visited, adding the pages of a run and counting the pages of a category do not depend on the size of the log.
+        A log.json written by earlier versions of the scraper is imported the first time.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            if self._visited_db:
+                return
+            self._visited_db = sqlite3.connect('../data/log.db', check_same_thread=False)
+            self._visited_db.execute('''
+                CREATE TABLE IF NOT EXISTS categories (
+                    category_id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+            ''')
+            self._visited_db.execute('''
+                CREATE TABLE IF NOT EXISTS visited (
+                    category_id INTEGER NOT NULL REFERENCES categories (category_id),
+                    pin_id INTEGER NOT NULL,
+                    PRIMARY KEY (category_id, pin_id)
+                ) WITHOUT ROWID
+            ''')
+            self._visited_db.execute('''
+                CREATE TABLE IF NOT EXISTS counters (
+                    category_id INTEGER PRIMARY KEY REFERENCES categories (category_id),
+                    last_index INTEGER NOT NULL
+                )
+            ''')
+            # The number of the last record of each category loaded into each RDS.
+            self._visited_db.execute('''
+                CREATE TABLE IF NOT EXISTS rds_loads (
+                    category_id INTEGER NOT NULL REFERENCES categories (category_id),
+                    target TEXT NOT NULL,
+                    last_index INTEGER NOT NULL,
+                    PRIMARY KEY (category_id, target)
+                )
+            ''')
+            for category_id, name in self._visited_db.execute('SELECT category_id, name FROM categories'):
+                self._category_ids[name] = category_id
+                self._category_names[category_id] = name
+            # Import the JSON log of earlier versions once and keep it under a new name.
+            if os.path.exists('../data/log.json'):
+                print('\nImporting log.json into log.db. ')
+                with open('../data/log.json', 'r') as load:
+                    logged = self._import_visited(json.load(load))
+                os.rename('../data/log.json', '../data/log.json.imported')
+                # Earlier versions numbered the records of a category by the entries logged for it, including hrefs
+                # which are not pin pages and variants of the same pin's href, so the counters carry on from those counts.
+                for category, count in logged.items():
+                    self._raise_counter(category, count)
+            self._visited_db.commit()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _import_visited(self, pages: list) -> dict:
+
+        ''' Defines a function which adds (category path, href) pairs logged by earlier versions of the scraper to the
+        visited log. Hrefs which are not pin pages are left out, but are still counted in the number of pairs given back
+        for each category, which earlier versions numbered the records of the category by.
+
+        Arguments
+        ---------
+        pages: list (The (category path, href) pairs to add.)
+
+        Returns
+        ---------
+        dict (The number of pairs logged for each category, before any was left out.) '''
+
+        rows = set()
+        logged = {}
+        for cat, href in pages:
+            category = cat.split('/')[0]
+            logged[category] = logged.get(category, 0) + 1
+            pin_id = self._pin_id_from_href(href)
+            if pin_id:
+                rows.add((self._category_id(category), int(pin_id)))
+        self._visited_db.executemany('INSERT OR IGNORE INTO visited VALUES (?, ?)', rows)
+        return logged
+
+    def _category_id(self, category: str) -> int:
+
+        ''' Defines a function which gives the id of a category from the category table of the visited log, adding the
+        category and its counter to the log if it is not in it yet.
+
+        Arguments
+        ---------
+        category: str (The name of the category.)
+
+        Returns
+        ---------
+        int (The id of the category.) '''
+
+        if category not in self._category_ids:
+            self._visited_db.execute('INSERT OR IGNORE INTO categories (name) VALUES (?)', (category,))
+            category_id = self._visited_db.execute(
+                'SELECT category_id FROM categories WHERE name = ?', (category,)
+            ).fetchone()[0]
+            self._visited_db.execute('INSERT OR IGNORE INTO counters VALUES (?, 0)', (category_id,))
+            self._visited_db.commit()
+            self._category_ids[category] = category_id
+            self._category_names[category_id] = category
+        return self._category_ids[category]
+
+    def _load_counters(self, selected_category_names: list) -> None:
+
+        ''' Defines a function which sets the counter of every category in the current run to the index of the last
+        record written for it, as kept in the visited log.
+
+        Arguments
+        ---------
+        selected_category_names: list (A list of all categories selected by the user for the current run.)
+
+        Returns
+        ---------
+        None '''
+
+        for category in selected_category_names:
+            self._counter_dict[category] = self._visited_db.execute(
+                'SELECT last_index FROM counters WHERE category_id = ?', (self._category_id(category),)
+            ).fetchone()[0]
+
+    def _raise_counter(self, category: str, index: int) -> None:
+
+        ''' Defines a function which makes sure the counter of a category is at least the index of a record already
+        written for it, so that the keys handed out next never overwrite an existing record.
+
+        Arguments
+        ---------
+        category: str (The name of the category.) \n
+        index: int (The index of the record, i.e. the n of {category}_{n}.)
+
+        Returns
+        ---------
+        None '''
+
+        category_id = self._category_id(category)
+        with self._visited_db:
+            self._visited_db.execute(
+                'UPDATE counters SET last_index = MAX(last_index, ?) WHERE category_id = ?', (index, category_id)
+            )
+        if category in self._counter_dict:
+            self._counter_dict[category] = max(self._counter_dict[category], index)
+
+    def _reserve_key(self, category: str) -> str:
+
+        ''' Defines a function which reserves the key of the next record of a category, i.e. {category}_{number}. The
+        counter is increased in the visited log in its own transaction, so no two workers or scrapers sharing the log
+        can be given the same key, and a stopped run never hands out a key again.
+
+        Arguments
+        ---------
+        category: str (The name of the category.)
+
+        Returns
+        ---------
+        str (The key of the record.) '''
+
+        category_id = self._category_ids[category]
+        with self._lock, self._visited_db:
+            self._visited_db.execute(
+                'UPDATE counters SET last_index = last_index + 1 WHERE category_id = ?', (category_id,)
+            )
+            index = self._visited_db.execute(
+                'SELECT last_index FROM counters WHERE category_id = ?', (category_id,)
+            ).fetchone()[0]
+            self._counter_dict[category] = index
+        return f'{category}_{index}'
+
+    def _pack_pin(self, category_id: int, pin_id: int) -> int:
+
+        ''' Defines a function which packs a category id and a pin id into the single integer used as the key of a page
+        in the frontier and in the checkpoint.
+
+        Arguments
+        ---------
+        category_id: int (The id of the category the pin was found in.) \n
+        pin_id: int (The Pinterest pin id.)
+
+        Returns
+        ---------
+        int (The key of the page.) '''
+
+        return pin_id << CATEGORY_ID_BITS | category_id
+
+    def _unpack_pin(self, page_key: int) -> tuple:
+
+        ''' Defines a function which splits the key of a page back into its category id and pin id.
+
+        Arguments
+        ---------
+        page_key: int (The key of the page.)
+
+        Returns
+        ---------
+        tuple (The category id and the pin id.) '''
+
+        return page_key & ((1 << CATEGORY_ID_BITS) - 1), page_key >> CATEGORY_ID_BITS
+
+    def _pin_url(self, pin_id: int) -> str:
+
+        ''' Defines a function which builds the href of an image page from its pin id, on the same site as the root URL.
+
+        Arguments
+        ---------
+        pin_id: int (The Pinterest pin id.)
+
+        Returns
+        ---------
+        str (The href of the image page.) '''
+
+        root = urllib.parse.urlsplit(self._root)
+        return f'{root.scheme}://{root.netloc}/pin/{pin_id}/'
+
+    def _filter_unvisited(self, category_id: int, pin_ids: set) -> set:
+
+        ''' Defines a function which keeps only the pins of a category which have not been visited on a previous run.
+
+        Arguments
+        ---------
+        category_id: int (The id of the category the pins were found in.) \n
+        pin_ids: set (The pin ids to check.)
+
+        Returns
+        ---------
+        set (The keys of the pages not visited before.) '''
+
+        # If the previous data of the category is being replaced every page is new.
+        if pin_ids and self._category_names[category_id] not in self._reset_categories:
+            placeholders = ', '.join('?' * len(pin_ids))
+            pin_ids = pin_ids.difference(row[0] for row in self._visited_db.execute(
+                f'SELECT pin_id FROM visited WHERE category_id = ? AND pin_id IN ({placeholders})',
+                [category_id, *pin_ids]
+            ))
+        return {self._pack_pin(category_id, pin_id) for pin_id in pin_ids}
+
+    def _forget_visits(self, categories: list) -> None:
+
+        ''' Defines a function which removes the pages of categories whose previous data has been deleted from the visited
+        log, along with the watermarks of their RDS loads, so their pages are scraped again and their tables rebuilt.
+
+        Arguments
+        ---------
+        categories: list (The names of the categories.)
+
+        Returns
+        ---------
+        None '''
+
+        with self._visited_db:
+            for category in categories:
+                if category in self._category_ids:
+                    self._visited_db.execute(
+                        'DELETE FROM visited WHERE category_id = ?', (self._category_ids[category],)
+                    )
+                    self._visited_db.execute(
+                        'DELETE FROM rds_loads WHERE category_id = ?', (self._category_ids[category],)
+                    )
+
+    def _record_visits(self) -> None:
+
+        ''' Defines a function which adds the pages visited on this run to the visited log, after forgetting the pages of
+        any category whose previous data has been replaced. The RDS tables of those categories are loaded from scratch
+        the next time.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        with self._visited_db:
+            self._forget_visits(self._reset_categories)
+            self._visited_db.executemany(
+                'INSERT OR IGNORE INTO visited VALUES (?, ?)',
+                (self._unpack_pin(page_key) for page_key in self._run_visited)
+            )
+
     def _check_for_logs(self, selected_category_names: list) -> Union[str, None]:
 
         ''' Defines a function which checks for data relating to a previous run of this script.
@@ -523,6 +1241,10 @@ your data/images to a remote bucket? Y or N: ').upper()
         None if no data relates to current run.) '''
 
         try: 
+            # Opens the log of pages visited on previous runs.
+            self._open_visited_log()
+            # The counter of each category carries on from the last record written for it.
+            self._load_counters(selected_category_names)
             # If there is has been a previous run and the logs are still on the system.
             if os.path.exists('../data/recent-save-log.json'):
                 # Loads the log regarding location of save data.
@@ -530,137 +1252,110 @@ your data/images to a remote bucket? Y or N: ').upper()
                     recent_saves = json.load(load)
                 # Gets the categories relating to the current run from the save data.
                 saves = [key for key in recent_saves if key in selected_category_names]
-                # Loads the log regarding web pages already visited as to not repeat data collection.
-                with open('../data/log.json', 'r') as load:
-                    contents = json.load(load)
-                    # Save data in log is saved as the href collected and the related category.
-                    tuples_content = [(item[0], item[1]) for item in contents]
                 # If any data relates to current run print which categories they are.
                 if saves:
                     print(f'\nWe have detected saved data for the follow categories: {saves}. ')
                     fresh = ''
                     # Asks the user if they would like to append to existing data to start afresh.
                     while fresh != 'Y' and fresh != 'N':
-                        fresh = input('\nWould you like to add to your existing data? Y or N: ').upper()
-                        # If user wants to append, update link set and log with the hrefs previously visited.
+                        # When resuming a stopped run, the answer given on that run is used again.
+                        if self._checkpoint and self._checkpoint['fresh']:
+                            fresh = self._checkpoint['fresh']
+                        else:
+                            fresh = input('\nWould you like to add to your existing data? Y or N: ').upper()
+                        # If user wants to append, the pages previously visited are skipped.
                         if fresh == 'Y':
-                            self._link_set = set(tuples_content)
-                            self._log = set(tuples_content)
-                            # Increase the counter dictionary for each category to the correct starting point.
-                            for cat, href in tuples_content:
-                                category = cat.split('/')[0]
-                                if category in selected_category_names:
-                                    self._counter_dict[category] += 1
+                            # The records of the saves are copied into the new json files when the data is dumped.
+                            self._appended_saves = saves
                             for save in saves:
-                                # If a category has a local save file, load the associated json data into the main dictionary.
-                                if recent_saves[save] == 'local':
-                                    with open(f'../data/{save}/{save}.json', 'r') as load:
-                                        self._main_dict[f'{save}'] = json.load(load)
-                                # If a category has a remote save file, load the associated json data into the main dictionary.
-                                elif recent_saves[save][0] == 'remote':
-                                    obj = self._s3_client.get_object(
-                                        Bucket = recent_saves[save][1],
-                                        Key = (f'pinterest/{save}/{save}.json')
-                                    ) 
-                                    self._main_dict[f'{save}'] = json.loads(obj['Body'].read())
-                                else: 
-                                    print('\nSomething fishy going on with the save_log. ')
+                                # New records are numbered after the last record of the save.
+                                self._raise_counter(
+                                    save, max((self._record_index(key) for key, value in self._iter_saved_records(save)), default=0)
+                                )
                         # If the user wants to start anew for current run categories, ensure data for categories not in this run
                         # remains intact while removing data relating to current run categories.
+                        # The visited pages of these categories are removed from the log when the run finishes.
                         elif fresh == 'N':
-                            tuples_content = [item for item in tuples_content if item[0].split('/')[0] not in saves]
-                            self._link_set = set(tuples_content)
-                            self._log = set(tuples_content)
+                            self._reset_categories = saves
                         else:
                             print('\nPlease re-enter your input. ')
                 # If there is save data but none relates to current run categories, ensure data is maintained.
                 else:
-                    self._link_set = set(tuples_content)
-                    self._log = set(tuples_content)
                     fresh = None
                     print("\nPrevious saves detected: None relate to this data collection run. ")
             # If no previous save data was found. 
             else:
                 fresh = None
+            self._fresh = fresh
+            # Carry on from where a stopped run of the same categories left off.
+            if self._checkpoint:
+                self._apply_checkpoint()
 
             return fresh
 
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
-    def _extract_links(self, container_xpath: str, elements_xpath: str, n_scrolls: int = 1) -> None:
+    def _load_checkpoint(self, selected_category_names: list) -> None:
 
-        ''' Defines a function which scrolls through the page relating to every category in the current run.
-        With each scroll it grabs the href of each image page that it finds and appends it to a set of hrefs. 
+        ''' Defines a function which looks for the checkpoint of a run that was stopped before it could finish. If the
+        checkpoint is for the same categories as the current run, the current run resumes from it. Otherwise it is discarded.
 
         Arguments
         ---------
-        container_xpath: str (The xpath for the web element which contains all the images on the page being scraped.) \n
-        elements_xpath: str (The xpath regarding the <a> tags which contain the hrefs the method gaathers.) \n
-        n_scrolls: int (The number of times a user wishes to scroll down each category page.)
+        selected_category_names: list (A list of all categories selected by the user for the current run.)
 
         Returns
         ---------
         None '''
 
         try:
-            # Opens the page for a category.
-            self._driver.get(self._root + self._category)
-            # Sets the maximum amount of pixels allowed for one scroll.
-            Y = 10**6    
-            sleep(2)
-            # Keep scrolling down teh specified number of times.
-            for _ in range(n_scrolls):
-                # Scrolls down the page.
-                self._driver.execute_script(f"window.scrollTo(0, {Y})")
-                sleep(1)
-                try:
-                    # Stores the href to each image page if the page contains the desired images.
-                    container = self._driver.find_element_by_xpath(container_xpath)
-                    link_list = container.find_elements_by_xpath(elements_xpath)
-                    # Displays the images grabbed in a specific scroll.
-                    print(f"\nNumber of images successfully extracted: {len(link_list)}")
-                    # Appends the hrefs to a set.
-                    self._link_set.update([(self._category, link.get_attribute('href')) for link in link_list])
-                    # Displays the total number of unique hrefs after every scroll.
-                    print(f"\nNumber of images unique to this run: {len(self._link_set) - len(self._log)}")
-                except: 
-                    # If the page contains no images, or there is an error loading image elements on a page, skip the category.
-                    print('\nNo images detected on this page. Moving to next page (if applicable). ')
-                    # Leaves a message in the dictionary to explain why there is no data.
-                    self._main_dict[self._category.split('/')[0]]['Message'] = 'No image data available for this category on this run. \
-\nThere may not be any images on this page or there may have been an error.'
-                    break
+            if os.path.exists('../data/checkpoint.json'):
+                with open('../data/checkpoint.json', 'r') as load:
+                    checkpoint = json.load(load)
+                # The pages scraped and the hrefs grabbed are kept in files of their own.
+                self._read_checkpoint_journal(checkpoint)
+                if sorted(checkpoint['categories']) == sorted(selected_category_names):
+                    print(f"\nResuming the previous run, {len(checkpoint['visited'])} pages were already scraped. ")
+                    self._checkpoint = checkpoint
+                else:
+                    print('\nA previous run of different categories was stopped before finishing, it will not be resumed. ')
+                    self._remove_checkpoint_files()
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
-    def _grab_images_src(self, selected_category: dict, n_scrolls: int = 1) -> None:
+    def _read_checkpoint_journal(self, checkpoint: dict) -> None:
 
-        ''' Defines a function which grabs all the hrefs for all the images to be grabbed during the run.
+        ''' Defines a function which adds the pages scraped and the images downloaded, read from the checkpoint journal,
+        and the hrefs grabbed, read from the checkpoint frontier file, to a checkpoint. Entries appended to the journal
+        after the checkpoint was written are cut off, as the records of their pages are cut off the segments.
 
         Arguments
         ---------
-        selected_category: dict (A dictionary of the categories in the current run as values to indexed keys.) \n
-        n_scrolls: int (The number of times a user wishes to scroll down each category page.)
+        checkpoint: dict (The checkpoint, as loaded from checkpoint.json.)
 
         Returns
         ---------
         None '''
 
-        try:
-            # Loops through each category and runs extract_links to grab hrefs.
-            for category in selected_category.values():
-                self._category = category.replace(self._root, "")
-                self._extract_links(self._xpath_dict['links_container'], 
-                                    self._xpath_dict['links_element'],
-                                    n_scrolls)
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
-
-    def _generate_unique_id(self) -> None:
-
-        ''' Defines a function which generates a unique ID (uuid4) for every image page
-        that is scraped by the scraper. 
+        checkpoint['visited'] = []
+        checkpoint['downloads'] = []
+        checkpoint['frontier'] = []
+        if os.path.exists('../data/checkpoint-journal.jsonl'):
+            with open('../data/checkpoint-journal.jsonl', 'r+') as journal:
+                journal.truncate(checkpoint['journal'])
+                for line in journal:
+                    entry = json.loads(line)
+                    checkpoint['visited'].extend(entry['visited'])
+                    checkpoint['downloads'].extend(entry['downloads'])
+        if os.path.exists('../data/checkpoint-frontier.json'):
+            with open('../data/checkpoint-frontier.json', 'r') as load:
+                checkpoint['frontier'] = json.load(load)
+
+    def _apply_checkpoint(self) -> None:
+
+        ''' Defines a function which restores the state of a stopped run from its checkpoint: the pages already scraped,
+        the counters and the hrefs still to be visited.
 
         Arguments
         ---------
@@ -671,74 +1366,357 @@ your data/images to a remote bucket? Y or N: ').upper()
         None '''
 
         try:
-            # Generates a uuid4.
-            self._current_dict['unique_id'] = str(uuid.uuid4())
-
+            # Pages scraped before the run was stopped are not visited again.
+            self._run_visited = list(self._checkpoint['visited'])
+            self._completed_downloads = list(self._checkpoint['downloads'])
+            self._uploaded_segments = dict(self._checkpoint.get('uploaded_segments', {}))
+            # Pages grabbed but not yet scraped are visited without scrolling through the categories again.
+            self._link_set.update(self._checkpoint['frontier'])
+            self._harvested = self._checkpoint['harvested']
+            # A run resumed on another day writes its Parquet files to the partition of the day it was started.
+            self._run_date = self._checkpoint['run_date']
+            for category, count in self._checkpoint['counters'].items():
+                self._counter_dict[category] = max(self._counter_dict.get(category, 0), count)
+            # The journal of the stopped run is carried on.
+            self._run_counters['journal_offset'] = self._checkpoint['journal']
+            self._run_counters['journaled_visits'] = len(self._run_visited)
+            self._run_counters['journaled_downloads'] = len(self._completed_downloads)
+            self._run_counters['checkpointed_links'] = len(self._link_set)
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
-    def _grab_title(self, title_element: str) -> None:
+    def _write_checkpoint(self) -> None:
 
-        ''' Defines a function that grabs the title from a Pinterest page and adds it to the key
-        "title" in self._current_dict. 
+        ''' Defines a function which writes a checkpoint of the current run: the pages scraped, the counters, the hrefs
+        grabbed, the images downloaded and the size of each segment file. The pages scraped and images downloaded since
+        the last checkpoint are appended to a journal, ../data/checkpoint-journal.jsonl, and the hrefs grabbed are only
+        written to ../data/checkpoint-frontier.json when more have been grabbed, so each checkpoint only costs as much as
+        what has changed. checkpoint.json holds the size of the journal and is replaced atomically, so a crash while
+        writing leaves the previous checkpoint intact. Must be called while holding the lock, right after the segment
+        files have been synced.
 
         Arguments
         ---------
-        title_element: str (The xpath that leads to the title web element of a given Pinterest page.)
+        None
 
         Returns
         ---------
         None '''
 
-        try:
-            # Finds the title web element of a page and assigns it to the dictionary of the current page data.
-            try:
-                title_element = self._driver.find_element_by_xpath(title_element)
-                self._current_dict["title"] = title_element.get_attribute('textContent')
-            # No title element found.
-            except:
-                self._current_dict["title"] = 'No Title Data Available'
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
-        
-    def _grab_description(self, desc_container, desc_element) -> None:
+        counters = self._run_counters
+        # The first checkpoint of a run which is not resumed starts a new journal.
+        with open('../data/checkpoint-journal.jsonl', 'w' if counters['journal_offset'] is None else 'a') as journal:
+            journal.write(json.dumps({
+                'visited': self._run_visited[counters['journaled_visits']:],
+                'downloads': self._completed_downloads[counters['journaled_downloads']:]
+            }) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+            counters['journal_offset'] = journal.tell()
+        counters['journaled_visits'] = len(self._run_visited)
+        counters['journaled_downloads'] = len(self._completed_downloads)
+        # The hrefs are only grabbed while the categories are scrolled, so the frontier is rarely rewritten.
+        if len(self._link_set) != counters['checkpointed_links']:
+            with open('../data/checkpoint-frontier.json.tmp', 'w') as save:
+                json.dump(list(self._link_set), save)
+                save.flush()
+                os.fsync(save.fileno())
+            os.replace('../data/checkpoint-frontier.json.tmp', '../data/checkpoint-frontier.json')
+            counters['checkpointed_links'] = len(self._link_set)
+        checkpoint = {
+            'categories': list(self._counter_dict.keys()),
+            'fresh': self._fresh,
+            'counters': self._counter_dict,
+            'journal': counters['journal_offset'],
+            'harvested': self._harvested,
+            'run_date': self._run_date,
+            'uploaded_segments': self._uploaded_segments,
+            # Records written after this checkpoint are cut off the segments when resuming, as their pages will be redone.
+            'segments': {category: segment.tell() for category, segment in self._segment_files.items()}
+        }
+        with open('../data/checkpoint.json.tmp', 'w') as save:
+            json.dump(checkpoint, save)
+            save.flush()
+            os.fsync(save.fileno())
+        os.replace('../data/checkpoint.json.tmp', '../data/checkpoint.json')
 
-        ''' Defines a function that grabs the description from a Pinterest page and adds it to the key
-        "description" in self._current_dict. 
+    def _remove_checkpoint(self, selected_category_names: list) -> None:
+
+        ''' Defines a function which removes the checkpoint and the segment files once a run has finished.
 
         Arguments
         ---------
-        desc_container: str (The xpath for the web element which contains the description section of the page.) \n
-        desc_element: str (The xpath that leads to the description web element following the container xpath.)
+        selected_category_names: list (A list of all categories selected by the user for the current run.)
 
         Returns
         ---------
         None '''
 
-        try: 
-            # Grabs the container of the description box.
-            description_container = self._driver.find_element_by_xpath(desc_container)
-            # Tries to grab the desctiption if it is present. If not, no description available.
-            try:
-                description_element = WebDriverWait(description_container, 0.5).until(
-                    EC.presence_of_element_located((By.XPATH, desc_element))
-                )
-                self._current_dict["description"] = description_element.get_attribute('textContent')
-            # No description available.
-            except:
-                self._current_dict["description"] = 'No description available'
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
+        for category in selected_category_names:
+            if os.path.exists(f'../data/segments/{category}.jsonl'):
+                os.remove(f'../data/segments/{category}.jsonl')
+        self._remove_checkpoint_files()
 
-    def _grab_user_and_count(self, dict_container, dict_element) -> None:
+    def _remove_checkpoint_files(self) -> None:
 
-        ''' Defines a function that grabs the poster name and follower count and appends adds them to the keys
-        "poster_name" and "follower_count" respectively in self._current_dict. 
+        ''' Defines a function which removes the checkpoint, its journal and its frontier file.
 
         Arguments
         ---------
-        dict_container: str (The xpath for the web element which contains the user information section of the page.) \n
-        dict_element: str (The xpath that leads to the description web element following the container xpath.)
+        None
+
+        Returns
+        ---------
+        None '''
+
+        for path in ['../data/checkpoint.json', '../data/checkpoint-journal.jsonl', '../data/checkpoint-frontier.json']:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _wait_for_grid_growth(self, container_xpath: str, previous_count: int) -> int:
+
+        ''' Defines a function which waits until the grid of images on a category page has more items than before
+        the last scroll, or until the scroll timeout passes.
+
+        Arguments
+        ---------
+        container_xpath: str (The xpath for the web element which contains all the images on the page being scraped.) \n
+        previous_count: int (The number of items in the grid before scrolling.)
+
+        Returns
+        ---------
+        int (The number of items in the grid once it has grown or the wait has timed out.) '''
+
+        def grid_size(driver) -> int:
+            return len(driver.find_elements_by_xpath(f'{container_xpath}/*'))
+
+        try:
+            # Wait until new items are appended to the grid.
+            WebDriverWait(self._driver, self._scroll_timeout).until(
+                lambda driver: grid_size(driver) > previous_count
+            )
+        except TimeoutException:
+            # Nothing new loaded in time, the caller decides whether the page is exhausted.
+            pass
+        return grid_size(self._driver)
+
+    def _harvest_new_links(self, container_xpath: str, elements_xpath: str) -> list:
+
+        ''' Defines a function which grabs the hrefs of the grid items that have been loaded since the previous call,
+        in a single call to the browser. Items already read are marked in the page and skipped on the next call.
+
+        Arguments
+        ---------
+        container_xpath: str (The xpath for the web element which contains all the images on the page being scraped.) \n
+        elements_xpath: str (The xpath regarding the <a> tags which contain the hrefs the method gaathers.)
+
+        Returns
+        ---------
+        list (The hrefs of the newly loaded grid items.) '''
+
+        hrefs = self._driver.execute_script(HARVEST_LINKS_SCRIPT, container_xpath, elements_xpath)
+        # If the grid container is missing there are no images on the page.
+        if hrefs is None:
+            raise Exception('No grid container on the page.')
+        return hrefs
+
+    def _extract_links(self, container_xpath: str, elements_xpath: str, n_scrolls: Union[int, None] = 1) -> None:
+
+        ''' Defines a function which scrolls through the page relating to every category in the current run.
+        With each scroll it grabs the href of each newly loaded image page and appends it to a set of hrefs.
+        Instead of sleeping after each scroll it waits for the grid to grow, and it stops early once the page
+        stops giving new hrefs or once the target number of new pins has been reached.
+
+        Arguments
+        ---------
+        container_xpath: str (The xpath for the web element which contains all the images on the page being scraped.) \n
+        elements_xpath: str (The xpath regarding the <a> tags which contain the hrefs the method gaathers.) \n
+        n_scrolls: Union[int, None] (The maximum number of times to scroll down each category page. None for no limit.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            # Opens the page for a category.
+            self._get(self._root + self._category)
+            # Sets the maximum amount of pixels allowed for one scroll.
+            Y = 10**6    
+            # Wait for the grid to be loaded rather than sleeping for a fixed amount of time.
+            try:
+                WebDriverWait(self._driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, container_xpath))
+                )
+            except TimeoutException:
+                pass
+            # The first pins of a category are in the page state rather than in a feed response.
+            if self._capture_network:
+                try:
+                    self._store_captured_pins(json.loads(self._driver.execute_script(PAGE_STATE_SCRIPT) or '{}'))
+                except ValueError:
+                    pass
+            grid_count = 0
+            # The pages are keyed on the id of the category in the visited log.
+            category_id = self._category_id(self._category.split('/')[0])
+            # Pages found in this category on this run which have not been visited before.
+            category_links = set()
+            # Number of scrolls in a row which did not give any new hrefs.
+            idle_scrolls = 0
+            scrolls = 0
+            # Keep scrolling down until the scroll limit, the target or the end of the page is reached.
+            while n_scrolls is None or scrolls < n_scrolls:
+                scrolls += 1
+                # Scrolls down the page and waits for more images to load.
+                self._driver.execute_script(f"window.scrollTo(0, {Y})")
+                grid_count = self._wait_for_grid_growth(container_xpath, grid_count)
+                try:
+                    # Stores the href to each image page that was appended to the grid since the last scroll.
+                    link_list = self._harvest_new_links(container_xpath, elements_xpath)
+                    # Grabs the pin data of the feed responses loaded by the scroll.
+                    if self._capture_network:
+                        self._capture_feed_responses()
+                    # Displays the images grabbed in a specific scroll.
+                    print(f"\nNumber of images successfully extracted: {len(link_list)}")
+                    # Different forms of the href of a pin all give the same pin id.
+                    pin_ids = {int(pin_id) for pin_id in map(self._pin_id_from_href, link_list) if pin_id}
+                    new_links = self._filter_unvisited(category_id, pin_ids).difference(category_links)
+                    category_links.update(new_links)
+                    # Appends the hrefs to a set.
+                    self._link_set.update(new_links)
+                    # Displays the total number of unique hrefs after every scroll.
+                    print(f"\nNumber of images unique to this run: {len(self._link_set)}")
+                except: 
+                    # If the page contains no images, or there is an error loading image elements on a page, skip the category.
+                    print('\nNo images detected on this page. Moving to next page (if applicable). ')
+                    # Leaves a message in the dictionary to explain why there is no data.
+                    self._main_dict[self._category.split('/')[0]]['Message'] = 'No image data available for this category on this run. \
+\nThere may not be any images on this page or there may have been an error.'
+                    break
+                # Stop once enough new pins have been found for this category.
+                if self._target_pins and len(category_links) >= self._target_pins:
+                    print(f'\nReached the target of {self._target_pins} new images for this category. ')
+                    break
+                # Stop if several scrolls in a row did not give anything new.
+                idle_scrolls = 0 if new_links else idle_scrolls + 1
+                if idle_scrolls >= self._scroll_patience:
+                    print('\nNo new images are loading. Moving to next page (if applicable). ')
+                    break
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _grab_images_src(self, selected_category: dict, n_scrolls: Union[int, None] = 1) -> None:
+
+        ''' Defines a function which grabs all the hrefs for all the images to be grabbed during the run.
+
+        Arguments
+        ---------
+        selected_category: dict (A dictionary of the categories in the current run as values to indexed keys.) \n
+        n_scrolls: Union[int, None] (The maximum number of times to scroll down each category page. None for no limit.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            # Loops through each category and runs extract_links to grab hrefs.
+            for category in selected_category.values():
+                self._category = category.replace(self._root, "")
+                self._extract_links(self._xpath_dict['links_container'], 
+                                    self._xpath_dict['links_element'],
+                                    n_scrolls)
+            # Save the hrefs grabbed so that a stopped run does not need to scroll through the categories again.
+            self._harvested = True
+            with self._lock:
+                self._sync_segments()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _generate_unique_id(self) -> None:
+
+        ''' Defines a function which generates a unique ID for every image page that is scraped by the
+        scraper. The ID is a uuid5 of the pin id, so the same pin gets the same ID on every run and in
+        every category. A uuid4 is used if the pin id is not known.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            # Generates a uuid5 from the pin id.
+            if self._current_pin_id:
+                self._current_dict['unique_id'] = str(uuid.uuid5(PIN_NAMESPACE, str(self._current_pin_id)))
+            else:
+                self._current_dict['unique_id'] = str(uuid.uuid4())
+
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _grab_title(self, title_element: str) -> None:
+
+        ''' Defines a function that grabs the title from a Pinterest page and adds it to the key
+        "title" in self._current_dict. 
+
+        Arguments
+        ---------
+        title_element: str (The xpath that leads to the title web element of a given Pinterest page.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            # Finds the title web element of a page and assigns it to the dictionary of the current page data.
+            try:
+                title_element = self._driver.find_element_by_xpath(title_element)
+                self._current_dict["title"] = title_element.get_attribute('textContent')
+            # No title element found.
+            except:
+                self._current_dict["title"] = 'No Title Data Available'
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+        
+    def _grab_description(self, desc_container, desc_element) -> None:
+
+        ''' Defines a function that grabs the description from a Pinterest page and adds it to the key
+        "description" in self._current_dict. 
+
+        Arguments
+        ---------
+        desc_container: str (The xpath for the web element which contains the description section of the page.) \n
+        desc_element: str (The xpath that leads to the description web element following the container xpath.)
+
+        Returns
+        ---------
+        None '''
+
+        try: 
+            # Grabs the container of the description box.
+            description_container = self._driver.find_element_by_xpath(desc_container)
+            # Tries to grab the desctiption if it is present. If not, no description available.
+            try:
+                description_element = WebDriverWait(description_container, 0.5).until(
+                    EC.presence_of_element_located((By.XPATH, desc_element))
+                )
+                self._current_dict["description"] = description_element.get_attribute('textContent')
+            # No description available.
+            except:
+                self._current_dict["description"] = 'No description available'
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _grab_user_and_count(self, dict_container, dict_element) -> None:
+
+        ''' Defines a function that grabs the poster name and follower count and appends adds them to the keys
+        "poster_name" and "follower_count" respectively in self._current_dict. 
+
+        Arguments
+        ---------
+        dict_container: str (The xpath for the web element which contains the user information section of the page.) \n
+        dict_element: str (The xpath that leads to the description web element following the container xpath.)
 
         Returns
         ---------
@@ -750,6 +1728,10 @@ your data/images to a remote bucket? Y or N: ').upper()
                 container = self._driver.find_element_by_xpath(dict_container)
                 poster_element = container.find_element_by_xpath(dict_element)          
                 self._current_dict["poster_name"] = poster_element.get_attribute('textContent')
+                # Grabs the link to the poster's profile, which tells apart posters with the same name.
+                profile = container.find_elements_by_xpath('.//a[@href]')
+                if profile:
+                    self._current_dict["poster_href"] = profile[0].get_attribute('href')
                 # Grabs the follower count and assigns to current dict.
                 follower_element =  container.find_elements_by_xpath(self._xpath_dict['follower_element'])
                 followers = follower_element[-1].get_attribute('textContent')
@@ -797,9 +1779,154 @@ your data/images to a remote bucket? Y or N: ').upper()
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
+    def _fetch_image(self, src: str, path: str, key: str = None) -> bool:
+
+        ''' Defines a function run by the download threads which downloads an image with the pooled HTTP session.
+        Downloads from the same host are limited so that a single host is not flooded with requests. If a key is given
+        the response is streamed straight to the S3 bucket by the transfer manager instead of being written to disk, so
+        only a multipart chunk of the image is held in memory at a time.
+
+        Arguments
+        ---------
+        src: str (The src link for the picture being downloaded.) \n
+        path: str (The path to save the image to.) \n
+        key: str (The key to upload the image to in the S3 bucket, or None to save it to path.)
+
+        Returns
+        ---------
+        bool (Whether the image was downloaded.) '''
+
+        # If the run is being stopped, skip the downloads still queued.
+        if self._stop_workers.is_set():
+            return False
+        host = urllib.parse.urlparse(src).netloc
+        with self._lock:
+            host_slots = self._host_slots.setdefault(host, threading.Semaphore(self._downloads_per_host))
+        with host_slots:
+            response = None
+            try:
+                # Failed connections and server errors are retried by the session.
+                response = self._session.get(src, timeout=30, stream=True)
+                response.raise_for_status()
+                if key:
+                    # Undoes any gzip or deflate encoding of the body as it is read by the upload.
+                    response.raw.decode_content = True
+                    self._upload_manager.upload(response.raw, self.s3_bucket, key).result()
+                    with self._lock:
+                        self._run_counters['streamed_images'] += 1
+                    return True
+                with open(path, 'wb') as image:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        image.write(chunk)
+                return True
+            except (requests.RequestException, StreamError, OSError, BotoCoreError, ClientError) as error:
+                print(f'\nImage download error: {error}')
+                return False
+            finally:
+                # Releases the connection back to the pool even if the body was not read to its end.
+                if response is not None:
+                    response.close()
+
+    def _queue_download(self, src: str, path: str, record: dict, category: str) -> Future:
+
+        ''' Defines a function which queues an image to be downloaded by the download threads. The image of a category
+        saved remotely is streamed straight to the S3 bucket rather than to the temp folder. The "downloaded" key of the
+        record is set once the download has finished. If too many downloads are queued already, waits for a free slot.
+
+        Arguments
+        ---------
+        src: str (The src link for the picture being downloaded.) \n
+        path: str (The path to save the image to.) \n
+        record: dict (The dictionary of the page the image belongs to.) \n
+        category: str (The name of the category the image belongs to.)
+
+        Returns
+        ---------
+        Future (The queued download.) '''
+
+        key = None
+        if self._upload_manager and category in self._s3_list:
+            key = f'pinterest/{category}/{os.path.basename(path)}'
+        self._download_slots.acquire()
+        future = self._download_pool.submit(self._fetch_image, src, path, key)
+        with self._lock:
+            self._pending_downloads.add(future)
+
+        def finish(future: Future) -> None:
+            self._download_slots.release()
+            record['downloaded'] = not future.cancelled() and future.exception() is None and future.result()
+            with self._lock:
+                self._pending_downloads.discard(future)
+                if record['downloaded']:
+                    self._completed_downloads.append(os.path.basename(path))
+
+        future.add_done_callback(finish)
+        return future
+
+    def _wait_for_downloads(self) -> None:
+
+        ''' Defines a function which waits until every queued image download has finished.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            with self._lock:
+                pending = list(self._pending_downloads)
+                records = list(self._pending_records)
+            if pending:
+                print(f'\nWaiting for {len(pending)} image downloads to finish. ')
+            # A download counts as finished once the record waiting for it has been stored too.
+            wait(pending + records)
+            # Raises any error met while storing a record.
+            for record in records:
+                record.result()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _store_after_download(self, download: Future, page_key: int, key: str, record: dict) -> None:
+
+        ''' Defines a function which stores the records of a page once its image download has finished. The download
+        future completes before its callbacks run, so the storing is tracked by a future of its own which
+        _wait_for_downloads waits on and which keeps any error met while storing.
+
+        Arguments
+        ---------
+        download: Future (The queued download of the image of the page.) \n
+        page_key: int (The key of the page which was visited.) \n
+        key: str (The key of the record, i.e. {category}_{number}.) \n
+        record: dict (The data of the page.)
+
+        Returns
+        ---------
+        None '''
+
+        stored = Future()
+        with self._lock:
+            self._pending_records.add(stored)
+
+        def store(download: Future) -> None:
+            try:
+                self._store_pin_records(page_key, key, record)
+                stored.set_result(None)
+            # A failed record is kept pending so that _wait_for_downloads raises its error.
+            except Exception as error:
+                stored.set_exception(error)
+                return
+            with self._lock:
+                self._pending_records.discard(stored)
+
+        download.add_done_callback(store)
+
     def _download_image(self, src: str) -> None:
 
-        ''' Defines a function that downloads the image on a page to the temp folder for it's respective category. 
+        ''' Defines a function that queues the image on a page to be downloaded to the temp folder for it's respective
+        category. The download happens in the background so the browser can move on to the next page straight away.
 
         Arguments
         ---------
@@ -810,14 +1937,13 @@ your data/images to a remote bucket? Y or N: ').upper()
         None '''
 
         try:
+            # Until the download has finished the image counts as not downloaded.
+            self._current_dict['downloaded'] = False
             # If the category is one for which the user previously decided they wanted to download images for.
             if self._cat_imgs_to_save[self._category]:
-                # Downloads the image to the appropriate folder.
-                urllib.request.urlretrieve(src, 
-                f"{self._root_save_path}/temp_{self._category}/{self._category}_{self._counter_dict[self._category]}.jpg")
-            # If the image is not downloaded enter as such in current dict.
-            else:
-                self._current_dict['downloaded'] = False
+                # Queues the image to be downloaded to the appropriate folder.
+                self._current_download = self._queue_download(src, 
+                f"{self._root_save_path}/temp_{self._category}/{self._current_key}.jpg", self._current_dict, self._category)
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
@@ -835,6 +1961,7 @@ your data/images to a remote bucket? Y or N: ').upper()
 
         try:
             # If there is not a key 'downloaded' from the _download_image method then the image has been downloaded.
+            # Queued downloads set the key themselves once they have finished.
             if 'downloaded' not in self._current_dict.keys():
                 # Append information as such to the current page dict.
                 self._current_dict['downloaded'] = True
@@ -857,16 +1984,28 @@ your data/images to a remote bucket? Y or N: ').upper()
         None '''
 
         try:
-            # If the category is to be saved remotely.
-            if self._category in self._s3_list:
-                # Append the bucket it will be saved to to the current dict.
-                self._current_dict['save_location'] = f"S3 bucket: {self.s3_bucket}"
-            else:
-                # Else appends a local save.
-                self._current_dict['save_location'] = f"Local save in /data/{self._category}"
+            self._current_dict['save_location'] = self._save_location(self._category)
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
+    def _save_location(self, category: str) -> str:
+
+        ''' Defines a function which gives the save location of the json file and images of a category.
+
+        Arguments
+        ---------
+        category: str (The name of the category.)
+
+        Returns
+        ---------
+        str (The save location of the category.) '''
+
+        # If the category is to be saved remotely, the bucket it will be saved to.
+        if category in self._s3_list:
+            return f"S3 bucket: {self.s3_bucket}"
+        # Else a local save.
+        return f"Local save in /data/{category}"
+
     def _grab_image_src(self) -> None:
 
         ''' Defines a function that grabs the image src from a Pinterest page and adds it to the key 
@@ -1057,10 +2196,11 @@ your data/images to a remote bucket? Y or N: ').upper()
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
-    def _grab_page_data(self) -> None:
+    def _grab_page_fields(self) -> None:
 
-        ''' Defines a function which combines all data grab methods and loops through all page links 
-        to grab the data from each page.
+        ''' Defines a function that grabs all the data of an image page with a single script run in the browser, instead
+        of the several calls per field made by _grab_all_users_and_counts. The script is rerun until the media of the page
+        has loaded or one second has passed. Then downloads the image if applicable.
 
         Arguments
         ---------
@@ -1071,55 +2211,847 @@ your data/images to a remote bucket? Y or N: ').upper()
         None '''
 
         try:
-            # Link set has hrefs appended during the run of the program, log defines the previously visited pages.
-            # Only go to the pages that are in the current run set and not in the log.
-            fresh_set = self._link_set.difference(self._log)
-            for (cat, link) in tqdm(list(fresh_set)):
-                # Grab only the name of the category to which the href belongs.
-                self._category = cat.split("/")[0]
-                # For every page we pass in a particular category increase the counter dictionary count of the category by 1.
-                self._counter_dict[f"{self._category}"] += 1
-                # Renew the current_dictionary for every page we visit.
-                self._current_dict = {}
-                # Go to the page for which we have the href.
-                self._driver.get(link)
-                # Grab all page data and download the image if applicable.
-                self._grab_all_users_and_counts()
-                # Append the current page dictionary to the main dictionary as a value to the key (category_(number of page in category list)).
-                self._main_dict[f"{self._category}"][f"{self._category}_{self._counter_dict[self._category]}"] = self._current_dict
+            fields = {}
+
+            def page_ready(driver) -> bool:
+                nonlocal fields
+                fields = driver.execute_script(EXTRACT_PIN_SCRIPT, self._xpath_dict) or {}
+                return fields.get('ready', False)
+
+            try:
+                # Waits for the media element to load as the page layout is only known once it has.
+                WebDriverWait(self._driver, 1).until(page_ready)
+            except TimeoutException:
+                pass
+            # Generates a unique id for the current page dict.
+            self._generate_unique_id()
+            # Copies the grabbed fields to the current page dict in the same order as the xpath extraction.
+            for key in ['title', 'description', 'poster_name', 'poster_href', 'follower_count', 'tag_list', 'is_image_or_video', 'image_src']:
+                if fields.get(key) is not None:
+                    self._current_dict[key] = fields[key]
+            if self._current_dict.get('poster_name') == 'User Info Error':
+                print('User Info Error')
+            if fields.get('ready'):
+                # Download the image if user wants images downloaded for this category.
+                self._download_image(self._current_dict["image_src"])
+                # Appends if image has been downloaded or not to the current dict.
+                self._is_img_downloaded()
+            # If the media did not load there is a page layout that we have not encountered before.
+            else:
+                if fields.get('layout') == 'story':
+                    self._current_dict['image_src'] = 'Image src error.'
+                    print('\nStory image grab error.')
+                else:
+                    self._current_dict.pop('image_src', None)
+                    print('\nImage grab Error. Possible embedded video (youtube).')
+                self._current_dict['downloaded'] = False
+            # Appends the save location of the image to the current dict.
+            self._save_location_key()
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
-    def _data_dump(self, selected_category_names: list) -> None:
+    def _pin_id_from_href(self, href: str) -> Union[str, None]:
 
-        ''' Defines a function which dumps the compiled dictionary for each category to its respective folder to be saved
-        as a json file.
+        ''' Defines a function which gets the Pinterest pin id out of the href of an image page.
 
         Arguments
         ---------
-        selected_category_names: list (A list of all categories selected by the user for the current run.)
+        href: str (The href of an image page, e.g. https://www.pinterest.co.uk/pin/123456/.)
 
         Returns
         ---------
-        None '''
+        Union[str, None] (The pin id, or None if the href is not a pin page.) '''
 
-        try:
-            # If the data folder doesn't exist, create it and change directory to said data folder.
-            if not os.path.exists('../data'):
-                os.mkdir('../data')
-            os.chdir('..')
-            os.chdir('data')
+        match = re.search(r'/pin/(\d+)', href)
+        return match.group(1) if match else None
 
-            print('Dumping Data: ')
-            # Dump the full dictionary for each category as a json file to its folder.
-            for name in tqdm(selected_category_names):
-                with open(f'temp_{name}/{name}.json', 'w') as loading:
-                    json.dump(self._main_dict[f"{name}"], loading)
+    def _find_pin_in_state(self, state: Union[dict, list], pin_id: str) -> Union[dict, None]:
 
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
+        ''' Defines a function which searches the page state JSON embedded in an image page for the object
+        describing the pin itself.
 
-    def _data_transferal(self, selected_category_names: list) -> None:
+        Arguments
+        ---------
+        state: Union[dict, list] (The parsed page state, or a part of it.) \n
+        pin_id: str (The id of the pin being looked for.)
+
+        Returns
+        ---------
+        Union[dict, None] (The pin object, or None if it is not in the state.) '''
+
+        # Walk the state without recursion as it can be deeply nested.
+        stack = [state]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if str(node.get('id')) == pin_id and ('images' in node or 'pinner' in node):
+                    return node
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return None
+
+    def _pins_in_state(self, state: Union[dict, list]) -> list:
+
+        ''' Defines a function which finds every pin object in a page state or in the JSON response of a feed.
+
+        Arguments
+        ---------
+        state: Union[dict, list] (The parsed page state or response.)
+
+        Returns
+        ---------
+        list (The pin objects found.) '''
+
+        pins = []
+        stack = [state]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if node.get('type') == 'pin' and node.get('id'):
+                    pins.append(node)
+                else:
+                    stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return pins
+
+    def _store_captured_pins(self, state: Union[dict, list]) -> None:
+
+        ''' Defines a function which maps every pin found in a page state or feed response to record fields and
+        keeps them until the pin's image page would be visited.
+
+        Arguments
+        ---------
+        state: Union[dict, list] (The parsed page state or response.)
+
+        Returns
+        ---------
+        None '''
+
+        for pin in self._pins_in_state(state):
+            self._captured_pins[str(pin['id'])] = self._map_pin_state(pin)
+
+    def _capture_feed_responses(self) -> None:
+
+        ''' Defines a function which reads the DevTools network events logged since the last call and grabs the pins
+        contained in the JSON responses of the Pinterest feed resources loaded by scrolling.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            for entry in self._driver.get_log('performance'):
+                message = json.loads(entry['message'])['message']
+                params = message.get('params', {})
+                # Remember the feed requests, their body can only be read once it has finished loading.
+                if message['method'] == 'Network.responseReceived':
+                    response = params['response']
+                    if '/resource/' in response['url'] and 'json' in response.get('mimeType', ''):
+                        self._pending_responses.add(params['requestId'])
+                elif message['method'] == 'Network.loadingFinished' and params.get('requestId') in self._pending_responses:
+                    self._pending_responses.discard(params['requestId'])
+                    try:
+                        body = self._driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                        self._store_captured_pins(json.loads(body['body']))
+                    # The body may have been evicted from the browser's buffer, the page will be visited instead.
+                    except Exception:
+                        continue
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _map_story_state(self, story: dict, fields: dict) -> None:
+
+        ''' Defines a function which adds the media of a story pin to the fields of a record. Story pins keep their
+        media in pages of blocks rather than on the pin itself.
+
+        Arguments
+        ---------
+        story: dict (The story_pin_data object of the pin.) \n
+        fields: dict (The fields of the record being built.)
+
+        Returns
+        ---------
+        None '''
+
+        blocks = [block for page in story.get('pages') or [] for block in page.get('blocks') or []]
+        videos = [block['video'] for block in blocks if block.get('video')]
+        images = [block['image'] for block in blocks if block.get('image')]
+        if images:
+            fields['is_image_or_video'] = 'image(story page format)'
+            image_srcs = {size: image['url'] for size, image in (images[0].get('images') or {}).items() if image.get('url')}
+            fields['image_srcs'] = image_srcs
+            fields['image_src'] = image_srcs.get('originals') or image_srcs.get('orig') or next(iter(image_srcs.values()), None)
+        elif videos:
+            fields['is_image_or_video'] = 'multi-video(story page format)' if len(videos) > 1 else 'video(story page format)'
+            video_list = videos[0].get('video_list') or {}
+            fields['video_srcs'] = {quality: video['url'] for quality, video in video_list.items() if video.get('url')}
+            fields['image_src'] = next((video['thumbnail'] for video in video_list.values() if video.get('thumbnail')), None)
+
+    def _map_pin_state(self, pin: dict) -> dict:
+
+        ''' Defines a function which turns the pin object of the page state into the fields of a record,
+        using the same keys and placeholder values as the browser extraction. Also adds the urls of the image
+        (image_srcs) and video (video_srcs) of the pin at every resolution available.
+
+        Arguments
+        ---------
+        pin: dict (The pin object found in the page state.)
+
+        Returns
+        ---------
+        dict (The title, description, poster_name, follower_count, tag_list, is_image_or_video and image_src of the pin.) '''
+
+        fields = {}
+        fields['title'] = (pin.get('title') or pin.get('grid_title') or '').strip() or 'No Title Data Available'
+        story = pin.get('story_pin_data')
+        if story:
+            fields['description'] = 'No description available Story format'
+        else:
+            description = pin.get('description') or pin.get('closeup_unified_description') or ''
+            fields['description'] = description.strip() or 'No description available'
+        # The user shown on the page is the creator if there is one, else the pinner.
+        pinner = pin.get('native_creator') or pin.get('pinner') or {}
+        fields['poster_name'] = pinner.get('full_name') or pinner.get('username') or 'User Info Error'
+        if pinner.get('username'):
+            fields['poster_href'] = f"/{pinner['username']}/"
+        follower_count = pinner.get('follower_count')
+        fields['follower_count'] = str(follower_count) if follower_count is not None else 'User Info Error'
+        tags = (pin.get('pin_join') or {}).get('visual_annotation')
+        fields['tag_list'] = tags if tags else 'No Tags Available'
+        # The image of the pin at every size, for videos this is the poster frame.
+        image_srcs = {size: image['url'] for size, image in (pin.get('images') or {}).items() if image.get('url')}
+        if image_srcs:
+            fields['is_image_or_video'] = 'image'
+            fields['image_src'] = image_srcs.get('orig') or next(iter(image_srcs.values()))
+            fields['image_srcs'] = image_srcs
+        video_list = (pin.get('videos') or {}).get('video_list') or {}
+        if video_list:
+            fields['is_image_or_video'] = 'video'
+            fields['video_srcs'] = {quality: video['url'] for quality, video in video_list.items() if video.get('url')}
+            if 'image_src' not in fields:
+                fields['image_src'] = next((video['thumbnail'] for video in video_list.values() if video.get('thumbnail')), None)
+        if story:
+            self._map_story_state(story, fields)
+        return fields
+
+    def _store_state_fields(self, fields: dict) -> None:
+
+        ''' Defines a function which fills the current page dict with the fields read from the page state, in the same
+        order as the browser extraction. Then downloads the image if applicable.
+
+        Arguments
+        ---------
+        fields: dict (The fields returned by _map_pin_state, or an empty dict if the page could not be read.)
+
+        Returns
+        ---------
+        None '''
+
+        # Generates a unique id for the current page dict.
+        self._generate_unique_id()
+        self._current_dict['title'] = fields.get('title', 'No Title Data Available')
+        self._current_dict['description'] = fields.get('description', 'No description available')
+        self._current_dict['poster_name'] = fields.get('poster_name', 'User Info Error')
+        if fields.get('poster_href'):
+            self._current_dict['poster_href'] = fields['poster_href']
+        self._current_dict['follower_count'] = fields.get('follower_count', 'User Info Error')
+        self._current_dict['tag_list'] = fields.get('tag_list', 'No Tags Available')
+        if fields.get('image_src'):
+            self._current_dict['is_image_or_video'] = fields['is_image_or_video']
+            self._current_dict['image_src'] = fields['image_src']
+            for key in ['image_srcs', 'video_srcs']:
+                if key in fields:
+                    self._current_dict[key] = fields[key]
+            # Download the image if user wants images downloaded for this category.
+            self._download_image(self._current_dict["image_src"])
+            # Appends if image has been downloaded or not to the current dict.
+            self._is_img_downloaded()
+        else:
+            self._current_dict['downloaded'] = False
+            print('\nImage grab Error. No image found in the page data.')
+        # Appends the save location of the image to the current dict.
+        self._save_location_key()
+
+    def _grab_page_fields_state(self, link: str) -> None:
+
+        ''' Defines a function that grabs the data of the image page open in the browser from the page state JSON
+        Pinterest embeds in the page, with one call to the browser and one JSON parse. If the page has no state for
+        the pin, falls back to _grab_page_fields.
+
+        Arguments
+        ---------
+        link: str (The href of the image page.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            pin = None
+            # Grab the text of the page state script tag.
+            state = self._driver.execute_script(PAGE_STATE_SCRIPT)
+            if state:
+                try:
+                    pin = self._find_pin_in_state(json.loads(state), self._pin_id_from_href(link))
+                except ValueError:
+                    pin = None
+            if pin:
+                self._store_state_fields(self._map_pin_state(pin))
+            else:
+                self._grab_page_fields()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _grab_page_fields_http(self, link: str) -> None:
+
+        ''' Defines a function that grabs the data of an image page without a browser. The page is fetched with the
+        pooled HTTP session and parsed with BeautifulSoup. The fields are read from the page state JSON embedded in the
+        page and, if that is missing, from the meta tags of the page. Then downloads the image if applicable.
+
+        Arguments
+        ---------
+        link: str (The href of the image page.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            fields = {}
+            try:
+                response = self._session.get(link, timeout=10)
+                response.raise_for_status()
+                soup = BeautifulSoup(response.text, 'html.parser')
+                # Pinterest ships the data of the page as JSON in a script tag.
+                pin = None
+                for script in soup.find_all('script', id=['__PWS_DATA__', 'initial-state']):
+                    try:
+                        pin = self._find_pin_in_state(json.loads(script.string), self._pin_id_from_href(link))
+                    except (TypeError, ValueError):
+                        continue
+                    if pin:
+                        fields = self._map_pin_state(pin)
+                        break
+                # If there is no page state, fall back to the meta tags of the page.
+                if not pin:
+                    meta = {tag.get('property') or tag.get('name'): tag.get('content') for tag in soup.find_all('meta')}
+                    fields['title'] = meta.get('og:title') or 'No Title Data Available'
+                    fields['description'] = meta.get('og:description') or 'No description available'
+                    if meta.get('og:image'):
+                        fields['is_image_or_video'] = 'image'
+                        fields['image_src'] = meta['og:image']
+            except requests.RequestException as error:
+                print(f'\nPage request error: {error}')
+            self._store_state_fields(fields)
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _scrape_pin(self, page_key: int) -> None:
+
+        ''' Defines a function which visits a single image page, grabs its data and stores it in the main dictionary.
+        The shared dictionaries are only touched while holding the lock, so page workers can run this at the same time.
+
+        Arguments
+        ---------
+        page_key: int (The key of the page, i.e. its pin id and the id of the category it was found in.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            category_id, pin_id = self._unpack_pin(page_key)
+            # Grab the name of the category to which the pin belongs and the href of its page.
+            self._category = self._category_names[category_id]
+            self._current_pin_id = pin_id
+            link = self._pin_url(pin_id)
+            # For every page we pass in a particular category increase the counter of the category by 1.
+            self._current_key = self._reserve_key(self._category)
+            # Renew the current_dictionary for every page we visit.
+            self._current_dict = {}
+            self._current_download = None
+            # Pin data captured from the network while scrolling, if any.
+            captured = self._captured_pins.pop(str(pin_id), None)
+            # Grab all page data and download the image if applicable.
+            # If the network gave all the data needed the image page does not need to be visited.
+            if captured and all(captured.get(key) not in [None, *PLACEHOLDER_VALUES] for key in CAPTURED_REQUIRED_FIELDS):
+                self._store_state_fields(captured)
+            elif self._extraction_mode == 'http':
+                self._grab_page_fields_http(link)
+            else:
+                # Go to the page for which we have the href.
+                self._get(link)
+                if self._extraction_mode == 'script':
+                    self._grab_page_fields()
+                elif self._extraction_mode == 'state':
+                    self._grab_page_fields_state(link)
+                else:
+                    self._grab_all_users_and_counts()
+            # Keeps which pin the record is for and when it was scraped.
+            self._current_dict['pin_id'] = pin_id
+            self._current_dict['scraped_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            # Fields missing from the image page are taken from the network data if it had them.
+            if captured:
+                for key in ['title', 'description', 'poster_name', 'follower_count', 'tag_list']:
+                    if self._current_dict.get(key) in PLACEHOLDER_VALUES and captured.get(key) not in [None, *PLACEHOLDER_VALUES]:
+                        self._current_dict[key] = captured[key]
+                if 'poster_href' not in self._current_dict and captured.get('poster_href'):
+                    self._current_dict['poster_href'] = captured['poster_href']
+            # Append the current page dictionary to the category's segment file with the key (category_(number of page in category list)).
+            # If its image is still downloading, the record is written once the download has finished.
+            # A pin found in several categories is stored in each of them, its other pages are not visited.
+            duplicates = self._duplicate_pages.get(page_key, [])
+            if duplicates:
+                self._current_dict['categories'] = [
+                    self._category_names[self._unpack_pin(key)[0]] for key in [page_key, *duplicates]
+                ]
+            if self._current_download:
+                self._store_after_download(self._current_download, page_key, self._current_key, self._current_dict)
+            else:
+                self._store_pin_records(page_key, self._current_key, self._current_dict)
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _open_segments(self, selected_category_names: list) -> None:
+
+        ''' Defines a function which opens a segment file for each category in the current run. Every record scraped is
+        appended to the segment of its category straight away, so the records do not have to be held in memory and a run
+        which is stopped part way keeps the records it has already scraped. A segment left behind by an earlier run that
+        was stopped is kept under a new name.
+
+        Arguments
+        ---------
+        selected_category_names: list (A list of all categories selected by the user for the current run.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            os.makedirs(f'{self._root_save_path}/segments', exist_ok=True)
+            for category in selected_category_names:
+                segment_path = f'{self._root_save_path}/segments/{category}.jsonl'
+                # When resuming, carry on with the segment of the stopped run from its last checkpoint.
+                if self._checkpoint and os.path.exists(segment_path):
+                    with open(segment_path, 'r+') as segment:
+                        segment.truncate(self._checkpoint['segments'].get(category, 0))
+                # Keep the records of a stopped run rather than mixing them with the records of this run.
+                elif os.path.exists(segment_path):
+                    partial_path = f'{self._root_save_path}/segments/{category}-{int(time.time())}.partial.jsonl'
+                    os.rename(segment_path, partial_path)
+                    print(f'\nRecords of a previous unfinished run have been kept in {partial_path}')
+                self._segment_files[category] = open(segment_path, 'a')
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _store_pin_records(self, page_key: int, key: str, record: dict) -> None:
+
+        ''' Defines a function which stores the record of a visited page, and a copy of it in every other category the
+        same pin was found in. Each copy gets its own key in its category and refers back to the visited record. The
+        image is only downloaded for the visited record, so the copies are not marked as downloaded and are given the
+        save location of their own category.
+
+        Arguments
+        ---------
+        page_key: int (The key of the page which was visited.) \n
+        key: str (The key of the record, i.e. {category}_{number}.) \n
+        record: dict (The data of the page.)
+
+        Returns
+        ---------
+        None '''
+
+        self._store_record(page_key, key, record)
+        for duplicate in self._duplicate_pages.get(page_key, []):
+            category = self._category_names[self._unpack_pin(duplicate)[0]]
+            self._store_record(duplicate, self._reserve_key(category), {
+                **record, 'downloaded': False, 'save_location': self._save_location(category), 'duplicate_of': key
+            })
+
+    def _store_record(self, page_key: int, key: str, record: dict) -> None:
+
+        ''' Defines a function which appends the record of a page to the segment file of its category. The segment files
+        are synced to disk, and a checkpoint written, every fsync_every records.
+
+        Arguments
+        ---------
+        page_key: int (The key of the page in the frontier.) \n
+        key: str (The key of the record, i.e. {category}_{number}.) \n
+        record: dict (The data of the page.)
+
+        Returns
+        ---------
+        None '''
+
+        category = self._category_names[self._unpack_pin(page_key)[0]]
+        with self._lock:
+            if category not in self._segment_files:
+                # The segments are closed when the run is stopped, the page of a record finishing after that is not in
+                # the checkpoint so it is scraped again when the run is resumed.
+                if self._stop_workers.is_set():
+                    print(f'\nThe run was stopped before {key} could be stored, its page will be scraped again. ')
+                    return
+                raise RuntimeError(f'The segment file of {category} is not open, {key} could not be stored. ')
+            self._segment_files[category].write(json.dumps({key: record}) + '\n')
+            self._run_visited.append(page_key)
+            self._run_counters['unsynced_records'] += 1
+            if self._run_counters['unsynced_records'] >= self._fsync_every:
+                self._sync_segments()
+
+    def _sync_segments(self) -> None:
+
+        ''' Defines a function which flushes every open segment file, syncs it to disk and writes a checkpoint.
+        Must be called while holding the lock.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        for segment in self._segment_files.values():
+            segment.flush()
+            os.fsync(segment.fileno())
+        self._run_counters['unsynced_records'] = 0
+        if self._segment_files:
+            self._upload_segment_parts()
+            self._write_checkpoint()
+
+    def _close_segments(self) -> None:
+
+        ''' Defines a function which syncs and closes every open segment file.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        with self._lock:
+            self._sync_segments()
+            for segment in self._segment_files.values():
+                segment.close()
+            self._segment_files = {}
+
+    def _dedupe_pages(self, fresh_set: set) -> set:
+
+        ''' Defines a function which groups the pages to visit by pin, as the same pin is often found in the grids of
+        several categories. Only one page of each pin is visited, and its image downloaded once, the others are
+        remembered so that the record can be stored in their categories as well.
+
+        Arguments
+        ---------
+        fresh_set: set (The keys of the pages which have not been visited before.)
+
+        Returns
+        ---------
+        set (The keys of the pages to visit.) '''
+
+        pins = {}
+        for page_key in fresh_set:
+            pins.setdefault(self._unpack_pin(page_key)[1], []).append(page_key)
+        # The page visited is one from a category whose images are downloaded, if there is one.
+        for page_keys in pins.values():
+            page_keys.sort(key=lambda page_key: (
+                not self._cat_imgs_to_save.get(self._category_names[self._unpack_pin(page_key)[0]]), page_key
+            ))
+        self._duplicate_pages = {page_keys[0]: page_keys[1:] for page_keys in pins.values() if len(page_keys) > 1}
+        if self._duplicate_pages:
+            print(f'\n{len(self._duplicate_pages)} images were found in more than one category, '
+                  f'{len(fresh_set) - len(pins)} page visits are saved. ')
+        return {page_keys[0] for page_keys in pins.values()}
+
+    def _page_worker(self, link_queue: queue.Queue, progress: tqdm, reuse_driver: bool) -> None:
+
+        ''' Defines a function run by every page worker. The worker is a shallow copy of the scraper with its own
+        browser and page state, while the dictionaries and the lock stay shared with the scraper. It keeps taking
+        page keys from the queue until the queue is empty or the workers are told to stop.
+
+        Arguments
+        ---------
+        link_queue: queue.Queue (The queue of the keys of the pages still to be visited.) \n
+        progress: tqdm (The progress bar shared by all workers.) \n
+        reuse_driver: bool (Whether the worker should use the main driver instead of opening a new browser.)
+
+        Returns
+        ---------
+        None '''
+
+        worker = copy.copy(self)
+        # In 'http' extraction mode the image pages are fetched without a browser.
+        if self._extraction_mode == 'http':
+            reuse_driver = True
+        if not reuse_driver:
+            worker._driver = self._create_driver()
+        restarts = 0
+        try:
+            while not self._stop_workers.is_set():
+                try:
+                    page_key = link_queue.get_nowait()
+                except queue.Empty:
+                    break
+                # An error on one page should not take the whole worker down with it.
+                try:
+                    worker._scrape_pin(page_key)
+                    restarts = 0
+                except Exception as error:
+                    # A browser which has crashed would fail every page straight away and drain the queue, so the page
+                    # is put back and the browser replaced.
+                    if isinstance(error, WebDriverException) and not self._driver_alive(worker._driver):
+                        link_queue.put(page_key)
+                        restarts += 1
+                        if restarts > MAX_BROWSER_RESTARTS:
+                            print(f'\nThe browser of a worker keeps crashing, the worker is stopped: {error}')
+                            break
+                        print(f'\nThe browser of a worker crashed, restarting it: {error}')
+                        try:
+                            worker._driver.quit()
+                        except WebDriverException:
+                            pass
+                        worker._driver = self._create_driver(reuse_driver and self._capture_network)
+                        # The scraper quits the main driver at the end, so it is replaced as well.
+                        if reuse_driver:
+                            self._driver = worker._driver
+                        continue
+                    print(f'\nPage error on {self._pin_url(self._unpack_pin(page_key)[1])}: {error}')
+                progress.update(1)
+        finally:
+            if not reuse_driver:
+                try:
+                    worker._driver.quit()
+                except WebDriverException:
+                    pass
+
+    def _driver_alive(self, driver: webdriver.Chrome) -> bool:
+
+        ''' Defines a function which checks whether a browser still responds, as opposed to an error on the page it has
+        open.
+
+        Arguments
+        ---------
+        driver: webdriver.Chrome (The browser to check.)
+
+        Returns
+        ---------
+        bool (Whether the browser responds.) '''
+
+        try:
+            driver.window_handles
+            return True
+        except WebDriverException:
+            return False
+
+    def _grab_page_data_parallel(self, fresh_set: set) -> None:
+
+        ''' Defines a function which spreads the image pages to visit over a pool of page workers,
+        each driving its own browser.
+
+        Arguments
+        ---------
+        fresh_set: set (The keys of the pages which have not been visited before.)
+
+        Returns
+        ---------
+        None '''
+
+        # Fill a queue that all workers pull from.
+        link_queue = queue.Queue()
+        for item in fresh_set:
+            link_queue.put(item)
+        n_workers = min(self._n_workers, len(fresh_set))
+        self._stop_workers.clear()
+        print(f'\nScraping pages with {n_workers} workers. ')
+        with tqdm(total=len(fresh_set)) as progress:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                # The first worker reuses the main driver so only n_workers - 1 new browsers are opened.
+                futures = [executor.submit(self._page_worker, link_queue, progress, i == 0) for i in range(n_workers)]
+                try:
+                    for future in futures:
+                        future.result()
+                # Let every worker finish the page it is on before the interrupt is passed on.
+                except KeyboardInterrupt:
+                    self._stop_workers.set()
+                    raise KeyboardInterrupt
+
+    def _grab_page_data(self) -> None:
+
+        ''' Defines a function which combines all data grab methods and loops through all page links 
+        to grab the data from each page. If more than one worker is configured the pages are scraped in parallel.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            # Link set has the pages grabbed during the run of the program which were not visited on previous runs.
+            # Only go to the pages that have not already been scraped on this run before it was stopped.
+            fresh_set = self._link_set.difference(self._run_visited)
+            # Images found in several categories are only visited once.
+            fresh_set = self._dedupe_pages(fresh_set)
+            if self._n_workers > 1 and len(fresh_set) > 1:
+                self._grab_page_data_parallel(fresh_set)
+            else:
+                for page_key in tqdm(list(fresh_set)):
+                    self._scrape_pin(page_key)
+            # The data can only be saved once all images have been downloaded.
+            self._wait_for_downloads()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _data_dump(self, selected_category_names: list) -> None:
+
+        ''' Defines a function which finalises the json file of each category in its temp folder. The records of a previous
+        save which is carried on are copied over first, then the messages about the category, and the records of this run
+        are then copied over from the category's segment file one line at a time, so the records never have to be held in
+        memory. The segment files are kept until the run has
+        finished, so that a run stopped after this point can still be resumed.
+
+        Arguments
+        ---------
+        selected_category_names: list (A list of all categories selected by the user for the current run.)
+
+        Returns
+        ---------
+        None '''
+
+        try:
+            # Make sure every record has reached the segment files.
+            self._close_segments()
+            # If the data folder doesn't exist, create it and change directory to said data folder.
+            if not os.path.exists('../data'):
+                os.mkdir('../data')
+            os.chdir('..')
+            os.chdir('data')
+
+            print('Dumping Data: ')
+            # Write the full dictionary for each category as a json file to its folder.
+            for name in tqdm(selected_category_names):
+                segment_path = f'segments/{name}.jsonl'
+                with open(f'temp_{name}/{name}.json', 'w') as loading:
+                    loading.write('{')
+                    separator = ''
+                    # Data from previous runs, read from the save one record at a time. Messages of the run replace old ones.
+                    if name in self._appended_saves:
+                        for key, value in self._iter_saved_records(name):
+                            if key not in self._main_dict[name]:
+                                loading.write(f'{separator}{json.dumps(key)}: {json.dumps(value)}')
+                                separator = ', '
+                    # Messages about the category.
+                    for key, value in self._main_dict[f"{name}"].items():
+                        loading.write(f'{separator}{json.dumps(key)}: {json.dumps(value)}')
+                        separator = ', '
+                    # Records scraped on this run.
+                    if os.path.exists(segment_path):
+                        with open(segment_path, 'r') as segment:
+                            for line in segment:
+                                for key, value in json.loads(line).items():
+                                    loading.write(f'{separator}{json.dumps(key)}: {json.dumps(value)}')
+                                    separator = ', '
+                    loading.write('}')
+                # The records of this run are also written to a Parquet file.
+                if self._parquet_output:
+                    self._write_parquet(name, segment_path)
+
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+
+    def _record_to_parquet_row(self, key: str, record: dict) -> dict:
+
+        ''' Defines a function which turns a record into a row of the Parquet files, with typed values.
+
+        Arguments
+        ---------
+        key: str (The key of the record, i.e. {category}_{number}.) \n
+        record: dict (The data of the page.)
+
+        Returns
+        ---------
+        dict (The row, with a value for every column of the Parquet files.) '''
+
+        scraped_at = record.get('scraped_at')
+        return {
+            'pin_id': record.get('pin_id'),
+            'key': key,
+            'unique_id': record.get('unique_id'),
+            'title': record.get('title'),
+            'description': record.get('description'),
+            'poster_name': record.get('poster_name'),
+            'follower_count': self._parse_follower_count(record.get('follower_count')),
+            'tag_list': record['tag_list'] if isinstance(record.get('tag_list'), list) else [],
+            'is_image_or_video': record.get('is_image_or_video'),
+            'image_src': record.get('image_src'),
+            'downloaded': record.get('downloaded'),
+            'scraped_at': datetime.fromisoformat(scraped_at) if scraped_at else None
+        }
+
+    def _write_parquet(self, name: str, segment_path: str) -> None:
+
+        ''' Defines a function which writes the records of a category scraped on this run to a Parquet file, partitioned
+        by category and the date the run was started on: parquet/category={category}/date={date}/. The records are read
+        from the category's segment file and written in row groups of PARQUET_BATCH_SIZE. The file is named after its
+        first and last record, so a run which is resumed after this point writes the same file again, even on another day.
+
+        Arguments
+        ---------
+        name: str (The name of the category.) \n
+        segment_path: str (The path of the segment file of the category.)
+
+        Returns
+        ---------
+        None '''
+
+        if not os.path.exists(segment_path):
+            return
+        schema = pa.schema([
+            ('pin_id', pa.int64()),
+            ('key', pa.string()),
+            ('unique_id', pa.string()),
+            ('title', pa.string()),
+            ('description', pa.string()),
+            ('poster_name', pa.string()),
+            ('follower_count', pa.int64()),
+            ('tag_list', pa.list_(pa.string())),
+            ('is_image_or_video', pa.string()),
+            ('image_src', pa.string()),
+            ('downloaded', pa.bool_()),
+            ('scraped_at', pa.timestamp('s', tz='UTC'))
+        ])
+        folder = f'{self._root_save_path}/parquet/category={name}/date={self._run_date}'
+        os.makedirs(folder, exist_ok=True)
+        temp_path = f'{folder}/part.parquet.tmp'
+        first_key = last_key = None
+        rows = []
+        with pq.ParquetWriter(temp_path, schema, compression='snappy') as writer, open(segment_path, 'r') as segment:
+            for line in segment:
+                for key, record in json.loads(line).items():
+                    first_key = first_key or key
+                    last_key = key
+                    rows.append(self._record_to_parquet_row(key, record))
+                if len(rows) >= PARQUET_BATCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                    rows = []
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        if first_key:
+            os.replace(temp_path, f'{folder}/part-{first_key}-{last_key}.parquet')
+        else:
+            os.remove(temp_path)
+
+    def _data_transferal(self, selected_category_names: list) -> None:
 
         ''' Defines a function which moves data from temp folders to it's final destination. Data is handled 
         in this way to remove errors when KeyboardInterrupting the scraping process. 
@@ -1136,6 +3068,8 @@ your data/images to a remote bucket? Y or N: ').upper()
 
             print('Moving files around a bit... ')
 
+            # The folders of the categories saved remotely are uploaded together at the end.
+            uploads = {}
             for category in tqdm(selected_category_names):
                 # Define the path for the file containing run data for the current category.
                 temp_path = f'../data/temp_{category}'
@@ -1156,21 +3090,120 @@ your data/images to a remote bucket? Y or N: ').upper()
                 # If the data is to be stored remotely.
                 else:
                     # Define the path to save in the s3 bucket.
-                    end_path = f'pinterest/{category}'
-                    # For every file in the temp folder, move it to the correct place in the s3 bucket then delete the temp folder.
-                    for file in os.listdir(temp_path):
-                        self._s3_client.upload_file(
-                            f'{temp_path}/{file}',
-                            self.s3_bucket,
-                            f'{end_path}/{file}'
-                    )
-                    shutil.rmtree(temp_path)
+                    uploads[temp_path] = f'pinterest/{category}'
+                    # The Parquet file of the run is kept in the bucket under the same partitions.
+                    parquet_path = f'{self._root_save_path}/parquet/category={category}/date={self._run_date}'
+                    if os.path.exists(parquet_path):
+                        uploads[parquet_path] = f'pinterest/parquet/category={category}/date={self._run_date}'
+            # Upload every file of the temp folders to the correct place in the s3 bucket then delete the temp folders.
+            if uploads:
+                self._upload_folders(uploads)
+            # The segments of the run are not needed once the full json is in the bucket.
+            for category in self._s3_list:
+                for keys in self._list_s3_keys(self.s3_bucket, f'pinterest/{category}/segments/'):
+                    self._delete_s3_keys(self.s3_bucket, keys)
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
+    def _start_uploader(self) -> None:
+
+        ''' Defines a function which starts the transfer manager uploading files to the S3 bucket in the background, if
+        any category of the run is saved remotely. Images are then streamed to the bucket as they are downloaded and the records
+        as soon as they are synced to the segment files, while the run goes on.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        if self._s3_list and not self._upload_manager:
+            self._upload_manager = create_transfer_manager(self._s3_client, self._transfer_config)
+
+    def _upload_segment_parts(self) -> None:
+
+        ''' Defines a function which uploads the records synced to the segment file of each remote category since its
+        last part was uploaded, as a new part: pinterest/{category}/segments/{category}-{offset}.jsonl. Only one part of a
+        category is uploaded at a time, so the parts never overlap, and the offset reached is kept in the checkpoint.
+        Must be called while holding the lock, right after the segment files have been synced.
+
+        Arguments
+        ---------
+        None
+
+        Returns
+        ---------
+        None '''
+
+        for category, segment in self._segment_files.items():
+            if category not in self._s3_list or not self._upload_manager:
+                continue
+            if category in self._segment_uploads:
+                future, end = self._segment_uploads[category]
+                if not future.done():
+                    continue
+                del self._segment_uploads[category]
+                try:
+                    future.result()
+                    self._uploaded_segments[category] = end
+                # A part which failed is uploaded again as part of the next one.
+                except Exception as error:
+                    print(f'\nSegment upload error: {error}')
+            start = self._uploaded_segments.get(category, 0)
+            end = segment.tell()
+            if end > start:
+                with open(segment.name, 'rb') as part:
+                    part.seek(start)
+                    data = io.BytesIO(part.read(end - start))
+                future = self._upload_manager.upload(
+                    data, self.s3_bucket, f'pinterest/{category}/segments/{category}-{start:012d}.jsonl'
+                )
+                self._segment_uploads[category] = (future, end)
+
+    def _upload_folders(self, uploads: dict) -> None:
+
+        ''' Defines a function which uploads the files of several local folders to the S3 bucket at the same time with
+        boto3's transfer manager, using up to upload_workers threads, multipart uploads for large files and the retry
+        policy of the S3 client. Images streamed to the bucket while scraping are not in the folders. A folder is only
+        deleted once all of its files have been uploaded. The number of files, the amount of data and the throughput are printed
+        at the end.
+
+        Arguments
+        ---------
+        uploads: dict (The S3 prefix each local folder is uploaded to, by folder path.)
+
+        Returns
+        ---------
+        None '''
+
+        start = time.perf_counter()
+        self._start_uploader()
+        for future, end in self._segment_uploads.values():
+            try:
+                future.result()
+            except Exception:
+                pass
+        files = [
+            (f'{folder}/{file}', f'{prefix}/{file}') for folder, prefix in uploads.items() for file in os.listdir(folder)
+        ]
+        total_bytes = sum(os.path.getsize(path) for path, key in files)
+        futures = [self._upload_manager.upload(path, self.s3_bucket, key) for path, key in files]
+        for future in tqdm(futures):
+            future.result()
+        self._upload_manager.shutdown()
+        self._upload_manager = None
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        print(f"{self._run_counters['streamed_images']} images were streamed to S3 while scraping. ")
+        print(f'Uploaded {len(files)} files ({total_bytes / MB:.1f} MB) in {elapsed:.1f}s: '
+              f'{len(files) / elapsed:.1f} files/s, {total_bytes / MB / elapsed:.1f} MB/s. ')
+        for folder in uploads:
+            shutil.rmtree(folder)
+
     def _create_log(self, selected_category_names: list) -> bool:
 
-        ''' Defines a function which creates two logs. One of which logs pages visited as to not repeat,
+        ''' Defines a function which updates two logs. One of which logs pages visited as to not repeat,
         the other a log of where the most recent save for each category is in order to update the most recent
         save on subsequent runs of the script.
 
@@ -1203,26 +3236,183 @@ your data/images to a remote bucket? Y or N: ').upper()
                     update = 'local'
                 # Append the save location to the dictionary for each category being saved.
                 self.recent_save_dict[category] = update
-            # Open a context manager for both logs and dump the data to the approproate json file.
-            with open('../data/log.json', 'w') as log, open('../data/recent-save-log.json', 'w') \
-            as save:
-                json.dump(list(self._link_set), log)
+            # Add the pages visited on this run to the visited log.
+            self._record_visits()
+            # Dump the save locations to the approproate json file.
+            with open('../data/recent-save-log.json', 'w') as save:
                 json.dump(self.recent_save_dict, save)
             
-            return os.path.exists('../data/log.json') and os.path.exists('../data/recent-save-log.json')
+            return os.path.exists('../data/log.db') and os.path.exists('../data/recent-save-log.json')
 
         except KeyboardInterrupt:
             raise KeyboardInterrupt
 
-    def _delete_old_files(self, fresh: str, selected_category_names: list) -> None:
+    def _update_save_log(self, category: str, location: Union[str, list, None]) -> None:
+
+        ''' Defines a function which rewrites the location of the save of a category in the save log as soon as its data
+        has been moved or deleted, so that a run which is stopped afterwards never leaves the log pointing at data which
+        is no longer there.
+
+        Arguments
+        ---------
+        category: str (The name of the category.) \n
+        location: Union[str, list, None] ('local', ['remote', bucket] or None if the save has been deleted.)
+
+        Returns
+        ---------
+        None '''
+
+        with open('../data/recent-save-log.json', 'r') as load:
+            saves = json.load(load)
+        if location is None:
+            saves.pop(category, None)
+        else:
+            saves[category] = location
+        with open('../data/recent-save-log.json.tmp', 'w') as save:
+            json.dump(saves, save)
+        os.replace('../data/recent-save-log.json.tmp', '../data/recent-save-log.json')
+
+    def _list_s3_keys(self, bucket: str, prefix: str) -> Iterator[List[str]]:
+
+        ''' Defines a generator which lists the keys of the objects under a prefix of a bucket with a paginator, a page
+        (up to 1000 keys) at a time.
+
+        Arguments
+        ---------
+        bucket: str (The name of the bucket.) \n
+        prefix: str (The prefix of the keys.)
+
+        Returns
+        ---------
+        Iterator[List[str]] (The keys of each page.) '''
+
+        paginator = self._s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys = [obj['Key'] for obj in page.get('Contents', [])]
+            if keys:
+                yield keys
+
+    def _delete_s3_keys(self, bucket: str, keys: list) -> None:
+
+        ''' Defines a function which deletes objects from a bucket with as few delete_objects requests as possible.
+
+        Arguments
+        ---------
+        bucket: str (The name of the bucket.) \n
+        keys: list (The keys of the objects to delete.)
+
+        Returns
+        ---------
+        None '''
+
+        for start in range(0, len(keys), S3_DELETE_BATCH):
+            response = self._s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={'Objects': [{'Key': key} for key in keys[start:start + S3_DELETE_BATCH]], 'Quiet': True}
+            )
+            # Only the keys which could not be deleted are listed in a quiet response.
+            for error in response.get('Errors', []):
+                print(f"\nCould not delete {error['Key']}: {error['Message']}")
+
+    def _relocate_s3_objects(self, save: str, source: str, target: str = None, keep: bool = True) -> None:
+
+        ''' Defines a function which moves the objects of a category out of a bucket, either to another bucket with
+        server-side copies or to the local save folder of the category, or only deletes them if they are not kept. The copies
+        and downloads of each page of keys run at the same time on a transfer manager, then the keys moved are deleted
+        from the source bucket in delete_objects batches. The keys moved but not yet deleted are kept in a manifest,
+        ../data/relocation-{category}.json, so a relocation which is stopped carries on without moving them again. The
+        json file of the category is moved last, so until the relocation has finished the save log still points at a
+        complete save. Segment parts are deleted rather than moved.
+
+        Arguments
+        ---------
+        save: str (The name of the category.) \n
+        source: str (The name of the bucket the objects are in.) \n
+        target: str (The name of the bucket to copy the objects to, None to download them to the local save folder.) \n
+        keep: bool (Whether the objects are moved, or only deleted.)
+
+        Returns
+        ---------
+        None '''
 
-        ''' Defines a function that deletes old save files if they become outdated.
+        prefix = f'pinterest/{save}/'
+        manifest_path = f'../data/relocation-{save}.json'
+        destination = target or 'local'
+        if keep and not target:
+            os.makedirs(f'../data/{save}', exist_ok=True)
+        # Keys of a stopped relocation to the same place which were moved before it could delete them.
+        moved = set()
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as load:
+                manifest = json.load(load)
+            if manifest['source'] == source and manifest['target'] == destination:
+                moved = set(manifest['moved'])
+        json_key = f'{prefix}{save}.json'
+
+        def pages() -> Iterator[List[str]]:
+            found = False
+            for keys in self._list_s3_keys(source, prefix):
+                found = found or json_key in keys
+                yield [key for key in keys if key != json_key]
+            if found:
+                yield [json_key]
+
+        manager = create_transfer_manager(self._s3_client, self._transfer_config) if keep else None
+        progress = tqdm(desc=save, unit=' files')
+        failed = 0
+        try:
+            for keys in pages():
+                if manager:
+                    futures = {}
+                    for key in keys:
+                        if key in moved:
+                            continue
+                        # Segment parts left by a stopped run hold records of a run which will not be resumed.
+                        if key.startswith(f'{prefix}segments/'):
+                            moved.add(key)
+                        elif target:
+                            futures[key] = manager.copy({'Bucket': source, 'Key': key}, target, key)
+                        else:
+                            # The local save folder is flat.
+                            futures[key] = manager.download(source, key, f'../data/{save}/{os.path.basename(key)}')
+                    for key, future in futures.items():
+                        try:
+                            future.result()
+                            moved.add(key)
+                        except (BotoCoreError, ClientError, OSError) as error:
+                            print(f'\nCould not relocate {key}: {error}')
+                            failed += 1
+                    done = [key for key in keys if key in moved]
+                    # The keys are recorded before they are deleted, so a stop in between does not move them twice.
+                    with open(f'{manifest_path}.tmp', 'w') as dump:
+                        json.dump({'source': source, 'target': destination, 'moved': done}, dump)
+                    os.replace(f'{manifest_path}.tmp', manifest_path)
+                else:
+                    done = keys
+                self._delete_s3_keys(source, done)
+                moved.difference_update(done)
+                progress.update(len(keys))
+        finally:
+            progress.close()
+            if manager:
+                manager.shutdown()
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        if failed:
+            print(f'{failed} files could not be relocated and were left in the {source} bucket. ')
+
+    def _delete_old_files(self, fresh: str, selected_category_names: list, remote_saves: bool) -> None:
+
+        ''' Defines a function that deletes old save files if they become outdated. Old saves kept in an S3 bucket are
+        handled before scraping, so that nothing uploaded by the run is deleted with them. Old saves kept locally are
+        only handled once the data of the run has been dumped, so a run which fails leaves them intact.
 
         Arguments
         ---------
         fresh: Union[str, None] ('Y' or 'N' if previous save data is detected and the user chooses so. \
         None if no data relates to current run.) \n
-        selected_category_names: list (A list of all categories selected by the user for the current run.)
+        selected_category_names: list (A list of all categories selected by the user for the current run.) \n
+        remote_saves: bool (Whether the old saves kept in an S3 bucket are handled, else those kept locally.)
 
         Returns
         ---------
@@ -1235,7 +3425,9 @@ your data/images to a remote bucket? Y or N: ').upper()
                 with open('../data/recent-save-log.json', 'r') as load:
                     old_saves = json.load(load)
                 # Grabs the save categories relating to the current run.
-                saves = [key for key in old_saves if key in selected_category_names] 
+                saves = [
+                    key for key in old_saves if key in selected_category_names and (old_saves[key] != 'local') == remote_saves
+                ]
                 # For every category that relates to the current run.
                 for save in saves:
                     # If the new data is to be saved remotely to the same remote bucket as the previous save data.
@@ -1243,71 +3435,54 @@ your data/images to a remote bucket? Y or N: ').upper()
                     and old_saves[save][1] == self.s3_bucket:
                         # If the user wants to delete olf data, remove all old data from the S3 bucket.
                         if fresh == 'N':
-                            s3 = boto3.resource('s3')
-                            bucket = s3.Bucket(old_saves[save][1])
-                            bucket.objects.filter(Prefix=f"pinterest/{save}/").delete()
+                            self._relocate_s3_objects(save, old_saves[save][1], keep=False)
                     # If the new data is to be saved remotely but to a different bucket than the previous save.
                     elif save in self._s3_list and old_saves[save][0] == 'remote' \
                     and old_saves[save][1] != self.s3_bucket:
-                        # Get the data from the previous bucket.
-                        s3 = boto3.resource('s3')
-                        src_bucket = s3.Bucket(old_saves[save][1])
-                        target_bucket = s3.Bucket(self.s3_bucket)
                         print('Relocating previous bucket save files. ')
-                        # For every item in the older bucket.
-                        for src in tqdm(src_bucket.objects.filter(Prefix=f"pinterest/{save}/")):
-                            # If continuing from old data, move old data to new bucket and delete data from old bucket.
-                            if fresh == 'Y':
-                                copy_source = {
-                                    'Bucket': src_bucket.name,
-                                    'Key': src.key
-                                }
-                                target_bucket.copy(copy_source, src.key)
-                                src.delete()
-                            # If not continuing from old save data, delete old data.
-                            elif fresh == 'N':
-                                src.delete()
+                        # If continuing from old data, copy old data to the new bucket and delete it from the old bucket.
+                        # If not continuing from old save data, only delete old data.
+                        self._relocate_s3_objects(save, old_saves[save][1], self.s3_bucket, keep=fresh == 'Y')
                     # If data to be saved locally but previous save was remote.
                     elif save not in self._s3_list and old_saves[save][0] == 'remote':
-                        # Grab all data from old bucket.
-                        s3 = boto3.resource('s3')
-                        src_bucket = s3.Bucket(old_saves[save][1])
                         print('Relocating previous bucket save files. ')
-                        # For every item in old bucket.
-                        for src in tqdm(src_bucket.objects.filter(Prefix=
-                        f"pinterest/{save}/")):
-                            # If continuing from old data, download remote data to correct local folder, delete data from bucket.
-                            if fresh == 'Y':
-                                src_bucket.download_file(src.key, 
-                                f"../data/temp_{save}/{src.key.split('/')[2]}")
-                                src.delete()
-                            # If not continuing from old data, delete data from old bucket.
-                            elif fresh == 'N':
-                                src.delete()
+                        # If continuing from old data, download remote data to the local save folder, delete data from bucket.
+                        # If not continuing from old data, only delete data from old bucket.
+                        self._relocate_s3_objects(save, old_saves[save][1], keep=fresh == 'Y')
                     # If new data to be saved locally and old data is also local. Pass unless not continuing from old data.
                     elif save not in self._s3_list and old_saves[save] == 'local':
                         # If not contunuing from old data, delete old data.
-                        if fresh == 'N':
+                        if fresh == 'N' and os.path.exists(f'../data/{save}'):
                             shutil.rmtree(f'../data/{save}')
                     # If new data to be saved remotely and old data is local.
                     elif save in self._s3_list and old_saves[save] == 'local':
-                        # Grab the remote bucket.
-                        s3 = boto3.resource('s3')
                         print('Relocating previous local save files. ')
-                        # For every item in old local folder.
-                        for item in tqdm(os.listdir(f'../data/{save}')):
-                            # If continuing from old data, upload previous data to designated bucket and delete data from local
-                            if fresh == 'Y':
-                                self._s3_client.upload_file(f'../data/{save}/{item}', 
-                                self.s3_bucket, f'pinterest/{save}/{item}')
-                            # If not continuing from old data, delete old data.
-                            elif fresh == 'N':
-                                pass
-                        shutil.rmtree(f'../data/{save}')
+                        # For every item in old local folder, if it has not been relocated already.
+                        old_items = os.listdir(f'../data/{save}') if os.path.exists(f'../data/{save}') else []
+                        # If continuing from old data, upload previous data to designated bucket at the same time.
+                        if fresh == 'Y' and old_items:
+                            manager = create_transfer_manager(self._s3_client, self._transfer_config)
+                            futures = [manager.upload(f'../data/{save}/{item}', self.s3_bucket, f'pinterest/{save}/{item}')
+                                for item in old_items]
+                            for future in tqdm(futures):
+                                future.result()
+                            manager.shutdown()
+                        # Delete data from local once it is all in the bucket, or straight away if not continuing from it.
+                        if os.path.exists(f'../data/{save}'):
+                            shutil.rmtree(f'../data/{save}')
                     else: 
                         # If there is a mistake in above code and something goes wrong, abort script to save integrity of old data.
                         print('Missed a scenario in _delete_old_files. ')
-                        self._driver.quit()
+                        continue
+                    # The save log is rewritten straight away, as a stopped run does not get to _create_log. Deleted data
+                    # is forgotten along with its visited pages, moved data is logged where it now is.
+                    if fresh == 'N':
+                        self._forget_visits([save])
+                        self._update_save_log(save, None)
+                    elif save in self._s3_list:
+                        self._update_save_log(save, ['remote', self.s3_bucket])
+                    else:
+                        self._update_save_log(save, 'local')
 
         except KeyboardInterrupt:
             raise KeyboardInterrupt
@@ -1358,32 +3533,558 @@ your data/images to a remote bucket? Y or N: ').upper()
 
         return engine
 
-    def _process_df(self, df) -> DataFrame:
+    def _rds_table(self, category: str) -> Table:
+
+        ''' Defines a function which describes the RDS table of a category. The table has a fixed set of columns, with
+        the unique_id of the records as its primary key so that records can be upserted.
+
+        Arguments
+        ---------
+        category: str (The name of the category.)
+
+        Returns
+        ---------
+        Table (The table of the category.) '''
+
+        return Table(
+            f'pinterest_{category}', MetaData(),
+            Column('unique_id', Text, primary_key=True),
+            *[Column(column, Boolean if column == 'downloaded' else Text) for column in RDS_COLUMNS]
+        )
+
+    def _record_to_row(self, name: str, record: dict) -> dict:
+
+        ''' Defines a function which turns a record of a category's json file into a row of its RDS table. Fields which
+        are lists or dictionaries are stored as json.
+
+        Arguments
+        ---------
+        name: str (The key of the record, i.e. {category}_{number}.) \n
+        record: dict (The data of the page.)
+
+        Returns
+        ---------
+        dict (The row, with a value for every column of the table.) '''
+
+        row = {'unique_id': record.get('unique_id'), 'name': name}
+        for column in RDS_COLUMNS[1:]:
+            value = record.get(column)
+            row[column] = json.dumps(value) if isinstance(value, (list, dict)) else value
+        return row
+
+    def _record_index(self, name: str) -> int:
+
+        ''' Defines a function which gives the number of a record from its key, i.e. the n of {category}_{n}.
+
+        Arguments
+        ---------
+        name: str (The key of the record.)
+
+        Returns
+        ---------
+        int (The number of the record, 0 if the key has none.) '''
+
+        try:
+            return int(name.rsplit('_', 1)[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def _rds_watermark(self, category: str, target: str) -> Union[int, None]:
+
+        ''' Defines a function which gives the number of the last record of a category loaded into an RDS.
+
+        Arguments
+        ---------
+        category: str (The name of the category.) \n
+        target: str (The host, port and database of the RDS.)
+
+        Returns
+        ---------
+        Union[int, None] (The number of the last record loaded, None if the table has to be loaded from scratch.) '''
+
+        row = self._visited_db.execute(
+            'SELECT last_index FROM rds_loads WHERE category_id = ? AND target = ?', (self._category_id(category), target)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _upsert_records(self, engine: Engine, category: str, rows: Iterator[dict], replace: bool) -> None:
+
+        ''' Defines a function which upserts rows into the RDS table of a category. Full loads and loads of at least
+        RDS_COPY_MIN_ROWS rows go through COPY, smaller loads are upserted with INSERT ... ON CONFLICT in transactions
+        of RDS_BATCH_SIZE rows. At most RDS_COPY_MIN_ROWS rows are held in memory at a time.
+
+        Arguments
+        ---------
+        engine: Engine (The RDS engine.) \n
+        category: str (The name of the category.) \n
+        rows: Iterator[dict] (The rows to upsert.) \n
+        replace: bool (Whether the table is dropped and created again before the rows are loaded.)
+
+        Returns
+        ---------
+        None '''
+
+        table = self._rds_table(category)
+        with engine.begin() as connection:
+            if replace:
+                table.drop(connection, checkfirst=True)
+            table.create(connection, checkfirst=True)
+        # Only as many rows as needed to choose between the two ways of loading are read ahead.
+        rows = iter(rows)
+        first_rows = [] if replace else list(itertools.islice(rows, RDS_COPY_MIN_ROWS))
+        if replace or len(first_rows) >= RDS_COPY_MIN_ROWS:
+            self._copy_records(engine, table, itertools.chain(first_rows, rows))
+            return
+        statement = postgres_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['unique_id'],
+            set_={column: statement.excluded[column] for column in RDS_COLUMNS}
+        )
+        for start in tqdm(range(0, len(first_rows), RDS_BATCH_SIZE)):
+            # A row can only be upserted once per statement, the last version of a record is kept.
+            batch = {row['unique_id']: row for row in first_rows[start:start + RDS_BATCH_SIZE]}
+            with engine.begin() as connection:
+                connection.execute(statement, list(batch.values()))
+
+    def _copy_value(self, value) -> str:
+
+        ''' Defines a function which writes a value in the text format of PostgreSQL's COPY.
+
+        Arguments
+        ---------
+        value: Union[str, bool, None] (The value of a column.)
+
+        Returns
+        ---------
+        str (The value as it appears in the COPY data.) '''
+
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+    def _copy_records(self, engine: Engine, table: Table, rows: Iterator[dict]) -> None:
+
+        ''' Defines a function which bulk loads rows into an RDS table. The rows are streamed into a temporary staging
+        table with COPY ... FROM STDIN and then merged into the table with a single INSERT ... ON CONFLICT statement,
+        all in one transaction.
+
+        Arguments
+        ---------
+        engine: Engine (The RDS engine.) \n
+        table: Table (The table to load the rows into.) \n
+        rows: Iterator[dict] (The rows to load.)
+
+        Returns
+        ---------
+        None '''
+
+        columns = ['unique_id', *RDS_COLUMNS]
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        # The rows are spooled to a temporary file so that COPY can read them in chunks.
+        with tempfile.TemporaryFile('w+') as data:
+            for row in rows:
+                data.write('\t'.join(self._copy_value(row[column]) for column in columns) + '\n')
+            data.seek(0)
+            connection = engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(f'CREATE TEMP TABLE pinterest_staging (LIKE "{table.name}") ON COMMIT DROP')
+                # The order of the rows is kept so that the last version of a record is the one merged.
+                cursor.execute('ALTER TABLE pinterest_staging ADD COLUMN load_order BIGSERIAL')
+                cursor.copy_expert(f'COPY pinterest_staging ({column_list}) FROM STDIN', data)
+                cursor.execute(f'''
+                    INSERT INTO "{table.name}" ({column_list})
+                    SELECT DISTINCT ON ("unique_id") {column_list} FROM pinterest_staging
+                    ORDER BY "unique_id", load_order DESC
+                    ON CONFLICT ("unique_id") DO UPDATE SET
+                    {', '.join(f'"{column}" = EXCLUDED."{column}"' for column in RDS_COLUMNS)}
+                ''')
+                connection.commit()
+            finally:
+                connection.close()
+
+    def _iter_saved_records(self, category: str) -> Iterator[tuple]:
+
+        ''' Defines a function which reads the records of the previous save of a category one at a time, from wherever the
+        save log says the save is kept: a local json file or a json file in an S3 bucket, streamed as it is downloaded.
+
+        Arguments
+        ---------
+        category: str (The name of the category.)
+
+        Returns
+        ---------
+        Iterator[tuple] (The (key, value) pairs of the save's json file.) '''
+
+        with open('../data/recent-save-log.json', 'r') as load:
+            location = json.load(load).get(category)
+        if location == 'local':
+            with open(f'../data/{category}/{category}.json', 'r') as stream:
+                yield from self._iter_json_records(stream)
+        elif location and location[0] == 'remote':
+            body = self._s3_client.get_object(Bucket=location[1], Key=f'pinterest/{category}/{category}.json')['Body']
+            try:
+                yield from self._iter_json_records(codecs.getreader('utf-8')(body))
+            finally:
+                body.close()
+        else:
+            print('\nSomething fishy going on with the save_log. ')
+
+    def _iter_json_records(self, stream) -> Iterator[tuple]:
+
+        ''' Defines a function which reads the (key, value) pairs of a json object one at a time, as the file is read in
+        chunks of JSON_CHUNK_SIZE characters. Only the pair being read is held in memory, however large the file.
+
+        Arguments
+        ---------
+        stream: file object (The json file, opened in text mode.)
+
+        Returns
+        ---------
+        Iterator[tuple] (The (key, value) pairs of the object, in the order of the file.) '''
+
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+        end_of_file = False
+        # What comes next: the opening brace, a key, the colon after a key, a value, or a comma or the closing brace.
+        expected = '{'
+        key = None
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+            need_more = position == len(buffer)
+            if not need_more and expected in ['key', 'value']:
+                # The object is empty.
+                if expected == 'key' and key is None and buffer[position] == '}':
+                    return
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A value not followed by a delimiter may carry on in the next chunk, e.g. a number cut at 1. of 1.5.
+                    need_more = not end_of_file and (end == len(buffer) or buffer[end] not in ',:} \t\n\r')
+                except ValueError:
+                    if end_of_file:
+                        raise
+                    need_more = True
+            # Read the next chunk, keeping the part of the buffer not parsed yet.
+            if need_more:
+                if end_of_file:
+                    raise ValueError('The json file ends before its object is closed.')
+                chunk = stream.read(JSON_CHUNK_SIZE)
+                buffer, position, end_of_file = buffer[position:] + chunk, 0, not chunk
+            elif expected == 'key':
+                key, position, expected = value, end, ':'
+            elif expected == 'value':
+                yield key, value
+                position, expected = end, ','
+            elif expected == ',' and buffer[position] == '}':
+                return
+            elif buffer[position] == expected:
+                position += 1
+                expected = {'{': 'key', ':': 'value', ',': 'key'}[expected]
+            else:
+                raise ValueError(f'Unexpected {buffer[position]!r} in the json file, expected {expected!r}.')
+
+    def _parse_follower_count(self, follower_count: str) -> Union[int, None]:
+
+        ''' Defines a function which turns a follower count as shown by Pinterest, e.g. 1.2k, 3M or 1,204, into a number.
+
+        Arguments
+        ---------
+        follower_count: str (The follower count of a record.)
+
+        Returns
+        ---------
+        Union[int, None] (The number of followers, None if the record has no follower count.) '''
+
+        match = re.fullmatch(r'([\d.,]+)\s*([kmb]?)', str(follower_count).strip().lower())
+        if not match:
+            return None
+        try:
+            return round(float(match.group(1).replace(',', '')) * FOLLOWER_MULTIPLIERS[match.group(2)])
+        except ValueError:
+            return None
+
+    def _create_normalized_schema(self, engine: Engine) -> None:
+
+        ''' Defines a function which creates the normalized tables shared by all categories, if they do not exist yet:
+        pins, posters, tags, pin_tags, categories and pin_categories, with their foreign keys and indexes. Posters are
+        keyed on the path of their profile, as different users can have the same name, or on their name for records
+        which have no link to the profile. Pins keep their pin id so they can be joined back to the visited log, and
+        whether the image was downloaded and where it was saved are kept per category, as they differ between copies.
+
+        Arguments
+        ---------
+        engine: Engine (The RDS engine.)
+
+        Returns
+        ---------
+        None '''
+
+        metadata = MetaData()
+        Table(
+            'posters', metadata,
+            Column('poster_id', Integer, primary_key=True),
+            # The path of the poster's profile, or the poster's name if the records have no link to the profile.
+            Column('poster_key', Text, nullable=False, unique=True),
+            # The path of the poster's profile, i.e. /{username}/.
+            Column('href', Text),
+            Column('name', Text, nullable=False),
+            Column('follower_count', BigInteger)
+        )
+        Table(
+            'pins', metadata,
+            Column('unique_id', Text, primary_key=True),
+            Column('pin_id', BigInteger, index=True),
+            Column('title', Text),
+            Column('description', Text),
+            Column('poster_id', Integer, ForeignKey('posters.poster_id'), index=True),
+            Column('is_image_or_video', Text),
+            Column('image_src', Text)
+        )
+        Table(
+            'tags', metadata,
+            Column('tag_id', Integer, primary_key=True),
+            Column('name', Text, nullable=False, unique=True)
+        )
+        Table(
+            'pin_tags', metadata,
+            Column('unique_id', Text, ForeignKey('pins.unique_id'), primary_key=True),
+            Column('tag_id', Integer, ForeignKey('tags.tag_id'), primary_key=True, index=True)
+        )
+        Table(
+            'categories', metadata,
+            Column('category_id', Integer, primary_key=True),
+            Column('name', Text, nullable=False, unique=True)
+        )
+        Table(
+            'pin_categories', metadata,
+            Column('unique_id', Text, ForeignKey('pins.unique_id'), primary_key=True),
+            Column('category_id', Integer, ForeignKey('categories.category_id'), primary_key=True, index=True),
+            # The key of the record in the category, i.e. {category}_{number}.
+            Column('name', Text),
+            Column('downloaded', Boolean),
+            Column('save_location', Text)
+        )
+        metadata.create_all(engine)
+        self._normalized_tables = metadata.tables
+
+    def _upsert_names(self, connection, table: Table, id_column: str, values: list, update: Union[list, None] = None,
+                      key: str = 'name') -> dict:
+
+        ''' Defines a function which upserts rows keyed on a unique name, e.g. posters or tags, and gives their ids.
+
+        Arguments
+        ---------
+        connection: Connection (The connection of the current transaction.) \n
+        table: Table (The table to upsert into.) \n
+        id_column: str (The name of the id column of the table.) \n
+        values: list (The rows to upsert, each with a name.) \n
+        update: Union[list, None] (The columns updated when the name is already in the table.) \n
+        key: str (The unique column the rows are keyed on, the name unless given.)
+
+        Returns
+        ---------
+        dict (The id of every name upserted.) '''
+
+        if not values:
+            return {}
+        statement = postgres_insert(table).values(values)
+        # Updating the key to itself makes rows which were already there come back from RETURNING too.
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={column: statement.excluded[column] for column in [key, *(update or [])]}
+        ).returning(table.c[id_column], table.c[key])
+        return {name: row_id for row_id, name in connection.execute(statement)}
+
+    def _poster_profile(self, record: dict) -> Union[str, None]:
+
+        ''' Defines a function which gives the path of the profile of the poster of a record, i.e. /{username}/, which
+        the posters of the normalized tables are keyed on.
+
+        Arguments
+        ---------
+        record: dict (The record.)
+
+        Returns
+        ---------
+        Union[str, None] (The path of the profile, or None if the record has no link to it.) '''
+
+        href = record.get('poster_href')
+        if not href:
+            return None
+        return urllib.parse.urlsplit(href).path.rstrip('/') + '/'
+
+    def _poster_key(self, record: dict) -> Union[str, None]:
 
-        ''' Defines a function which rearranges the dataframe into the proper format before sending to the RDS.
+        ''' Defines a function which gives the key of the poster of a record in the normalized tables: the path of the
+        poster's profile, or the poster's name if the record has no link to the profile.
 
         Arguments
         ---------
-        df: dataframe (pandas dataframe to reformat.)
+        record: dict (The record.)
 
         Returns
         ---------
-        df: dataframe (The pandas dataframe in the correct format to send to the RDS.) '''
+        Union[str, None] (The key of the poster, or None if the record has neither.) '''
 
-        # Transpose the dataframe.
-        df = df.T
-        df['name'] = df.index
-        # Make unique_id the index of the dataframe.
-        df = df.set_index('unique_id')
-        file_name_col = df.pop('name')
-        df.insert(0, 'name', file_name_col)
-        print(df.head(3))
-        return df
+        profile = self._poster_profile(record)
+        if profile:
+            return profile
+        if record.get('poster_name') in [None, *PLACEHOLDER_VALUES]:
+            return None
+        return record['poster_name']
+
+    def _load_normalized(self, engine: Engine, category: str, records: list) -> None:
+
+        ''' Defines a function which upserts a batch of records of a category into the normalized tables, in one
+        transaction.
+
+        Arguments
+        ---------
+        engine: Engine (The RDS engine.) \n
+        category: str (The name of the category.) \n
+        records: list (The (key, record) pairs of the batch.)
+
+        Returns
+        ---------
+        None '''
+
+        tables = self._normalized_tables
+        # The last version of a record in the batch is the one kept.
+        records = {record['unique_id']: (name, record) for name, record in records}
+        # Records scraped before the profile of the poster was kept are linked to a poster by name.
+        posters = {
+            self._poster_key(record): {
+                'poster_key': self._poster_key(record),
+                'href': self._poster_profile(record),
+                'name': record.get('poster_name'),
+                'follower_count': self._parse_follower_count(record.get('follower_count'))
+            }
+            for name, record in records.values()
+            if self._poster_key(record) and record.get('poster_name') not in [None, *PLACEHOLDER_VALUES]
+        }
+        tag_lists = {
+            unique_id: set(record['tag_list']) for unique_id, (name, record) in records.items()
+            if isinstance(record.get('tag_list'), list)
+        }
+        with engine.begin() as connection:
+            category_id = self._upsert_names(
+                connection, tables['categories'], 'category_id', [{'name': category}]
+            )[category]
+            poster_ids = self._upsert_names(
+                connection, tables['posters'], 'poster_id', list(posters.values()),
+                ['href', 'name', 'follower_count'], 'poster_key'
+            )
+            pins = postgres_insert(tables['pins'])
+            pin_columns = ['pin_id', 'title', 'description', 'poster_id', 'is_image_or_video', 'image_src']
+            connection.execute(
+                pins.on_conflict_do_update(
+                    index_elements=['unique_id'], set_={column: pins.excluded[column] for column in pin_columns}
+                ),
+                [{
+                    'unique_id': unique_id,
+                    **{column: record.get(column) for column in pin_columns},
+                    'poster_id': poster_ids.get(self._poster_key(record))
+                } for unique_id, (name, record) in records.items()]
+            )
+            # The tags of a pin are replaced by those of its latest record.
+            tag_ids = self._upsert_names(
+                connection, tables['tags'], 'tag_id', [{'name': tag} for tag in set().union(*tag_lists.values())]
+            )
+            connection.execute(tables['pin_tags'].delete().where(tables['pin_tags'].c.unique_id.in_(list(records))))
+            pin_tags = [
+                {'unique_id': unique_id, 'tag_id': tag_ids[tag]} for unique_id, tags in tag_lists.items() for tag in tags
+            ]
+            if pin_tags:
+                connection.execute(tables['pin_tags'].insert(), pin_tags)
+            pin_categories = postgres_insert(tables['pin_categories'])
+            connection.execute(
+                pin_categories.on_conflict_do_update(
+                    index_elements=['unique_id', 'category_id'],
+                    set_={column: pin_categories.excluded[column] for column in ['name', 'downloaded', 'save_location']}
+                ),
+                [{
+                    'unique_id': unique_id, 'category_id': category_id, 'name': name,
+                    'downloaded': record.get('downloaded'), 'save_location': record.get('save_location')
+                } for unique_id, (name, record) in records.items()]
+            )
+
+    def _clear_normalized_category(self, engine: Engine, category: str) -> None:
+
+        ''' Defines a function which removes the pins of a category from the normalized tables before the category is
+        loaded from scratch. The pins themselves are kept, as they may be in other categories too.
+
+        Arguments
+        ---------
+        engine: Engine (The RDS engine.) \n
+        category: str (The name of the category.)
+
+        Returns
+        ---------
+        None '''
+
+        tables = self._normalized_tables
+        with engine.begin() as connection:
+            category_id = self._upsert_names(
+                connection, tables['categories'], 'category_id', [{'name': category}]
+            )[category]
+            connection.execute(
+                tables['pin_categories'].delete().where(tables['pin_categories'].c.category_id == category_id)
+            )
+
+    def _load_category(self, engine: Engine, target: str, category: str, records: Iterator[tuple]) -> None:
+
+        ''' Defines a function which loads the records of a category added since its last load into its RDS table. If
+        the category has not been loaded into this RDS before, or its data has been replaced since, the table is loaded
+        from scratch. The records are read one at a time, so the json file never has to be held in memory. The records
+        are also loaded into the normalized tables, in batches of RDS_BATCH_SIZE.
+
+        Arguments
+        ---------
+        engine: Engine (The RDS engine.) \n
+        target: str (The host, port and database of the RDS.) \n
+        category: str (The name of the category.) \n
+        records: Iterator[tuple] (The (key, value) pairs of the category's json file.)
+
+        Returns
+        ---------
+        None '''
+
+        watermark = self._rds_watermark(category, target)
+        loaded = {'rows': 0, 'last_index': watermark or 0}
+        if watermark is None:
+            self._clear_normalized_category(engine, category)
+        batch = []
+
+        def new_rows():
+            for name, record in records:
+                # Messages about the category are not records.
+                if isinstance(record, dict) and record.get('unique_id') \
+                and (watermark is None or self._record_index(name) > watermark):
+                    loaded['rows'] += 1
+                    loaded['last_index'] = max(loaded['last_index'], self._record_index(name))
+                    batch.append((name, record))
+                    if len(batch) >= RDS_BATCH_SIZE:
+                        self._load_normalized(engine, category, batch)
+                        batch.clear()
+                    yield self._record_to_row(name, record)
+            if batch:
+                self._load_normalized(engine, category, batch)
+
+        self._upsert_records(engine, category, new_rows(), watermark is None)
+        print(f"{category}: {'loaded' if watermark is None else 'upserted'} {loaded['rows']} records. ")
+        with self._visited_db:
+            self._visited_db.execute(
+                'INSERT OR REPLACE INTO rds_loads VALUES (?, ?, ?)',
+                (self._category_id(category), target, loaded['last_index'])
+            )
 
     def _json_to_rds(self, data_path:str, remote: bool) -> None:
 
         ''' Defines a function which loads teh json files from both remote and local folders and turns
-        the data in to an RDS.
+        the data in to an RDS. Only the records added since the previous load of a category are upserted.
 
         Arguments
         ---------
@@ -1396,6 +4097,11 @@ your data/images to a remote bucket? Y or N: ').upper()
 
         # Connect to RDS.
         engine = self._connect_to_RDS(remote)
+        # The last record loaded into each table is kept in the visited log.
+        self._open_visited_log()
+        target = f'{engine.url.host}:{engine.url.port}/{engine.url.database}'
+        # The tables shared by all categories.
+        self._create_normalized_schema(engine)
 
         # Find all local JSON files.
         folders = os.listdir(data_path)
@@ -1409,10 +4115,9 @@ your data/images to a remote bucket? Y or N: ').upper()
             if type(val) == str: 
                 json_path = data_path + '/' + key + '/' + key +'.json'
                 print(json_path)
-                # Load local JSON file as a dataframe.
-                df = pd.read_json(json_path)
-                df = self._process_df(df)
-                df.to_sql(f'pinterest_{key}', engine, if_exists='replace')
+                # Stream the records of the local JSON file.
+                with open(json_path, 'r') as load:
+                    self._load_category(engine, target, key, self._iter_json_records(load))
             # For remote JSON files.
             elif type(val) == list: 
                 # Load file from S3 bucket.
@@ -1420,11 +4125,12 @@ your data/images to a remote bucket? Y or N: ').upper()
                     Bucket = val[1],
                     Key = (f'pinterest/{key}/{key}.json')
                 )
-                save_dict = json.loads(json_obj['Body'].read())
-                # Load as a dataframe.
-                df = pd.DataFrame.from_dict(save_dict)
-                df = self._process_df(df)
-                df.to_sql(f'pinterest_{key}', engine, if_exists='replace')
+                # Stream the records of the JSON file as it is downloaded.
+                body = json_obj['Body']
+                try:
+                    self._load_category(engine, target, key, self._iter_json_records(codecs.getreader('utf-8')(body)))
+                finally:
+                    body.close()
 
     def get_category_data(self) -> None:
 
@@ -1454,11 +4160,27 @@ your data/images to a remote bucket? Y or N: ').upper()
             self._save_to_cloud_or_local(selected_category_names)
             # Initialises counter dict and temp save folders.
             self._initialise_counter(selected_category_names)
+            # Looks for the checkpoint of a stopped run of the same categories to resume from.
+            self._load_checkpoint(selected_category_names)
             self._initialise_local_folders('../data', selected_category_names)
             # Searches for previosu save data.
             fresh = self._check_for_logs(selected_category_names)
-            # Asks the user how many times they would like to scrill through each category page.
-            while True:
+            # Opens the files the records of this run are streamed to.
+            self._open_segments(selected_category_names)
+            # Deletes redundant data before anything of this run is uploaded to the same place.
+            # A resumed run carries on with any relocation which was stopped, those which finished are in the save log.
+            self._delete_old_files(fresh, selected_category_names, remote_saves=True)
+            # Uploads the files of the categories saved remotely while the run goes on.
+            self._start_uploader()
+            # If resuming a run which had already grabbed its hrefs there is no need to scroll again.
+            if self._harvested:
+                scrolling_times = 0
+            # If a target number of pins is set, scroll each category until it is reached or the page runs out.
+            elif self._target_pins:
+                scrolling_times = None
+                print(f'\nScrolling each category until {self._target_pins} new images are found. ')
+            # Else asks the user how many times they would like to scrill through each category page.
+            while not self._target_pins and not self._harvested:
                 try:
                     scrolling_times = int(input('\nHow many times would you like to scroll through each category \
 (The average is 12-15 images per scroll)? '))
@@ -1468,24 +4190,40 @@ your data/images to a remote bucket? Y or N: ').upper()
                 except:
                     print('Invalid input, try again: ')
             # Grabs the hrefs for the images/data to be grabbed.
-            self._grab_images_src(selected_category, n_scrolls=scrolling_times)
+            if not self._harvested:
+                self._grab_images_src(selected_category, n_scrolls=scrolling_times)
             # Grabs data for every href saved.
             self._grab_page_data()
-            # Deletes redundant data.
-            self._delete_old_files(fresh, selected_category_names)
             # Saves data dictionaries as JSON files.
             self._data_dump(selected_category_names)
+            # Deletes or relocates the old local saves now that the data of the run has been dumped.
+            self._delete_old_files(fresh, selected_category_names, remote_saves=False)
             print('Please do not end the script now. May cause errors with later runs. ')
             # Moves data from temp save folders to final destination.
             self._data_transferal(selected_category_names)
             # Creates logs of the data collection for subsequent runs.
             log_created = self._create_log(selected_category_names)
+            # The run has finished so there is nothing left to resume.
+            self._remove_checkpoint(selected_category_names)
             self._driver.quit()
         # If there is a keyboard interrupt, preserve old save integrity and delete any new run data.
         except KeyboardInterrupt:
             print('\nTerminating Script.\nRemoving any accumulated data. ')
+            # Skip the image downloads which have not started yet.
+            self._stop_workers.set()
+            # Cancel the uploads in the background, files not uploaded yet are uploaded when the run is resumed.
+            if self._upload_manager:
+                self._upload_manager.shutdown(cancel=True)
+                self._upload_manager = None
             try:
-                if selected_category_names:
+                # Keep the records scraped so far on disk.
+                if self._segment_files:
+                    self._close_segments()
+                    print('Records scraped so far have been kept in ../data/segments. ')
+                # If a checkpoint was written, keep the downloaded images so that the next run can resume.
+                if os.path.exists('../data/checkpoint.json'):
+                    print('Progress has been saved. Run the same categories again to resume. ')
+                elif selected_category_names:
                     for category in tqdm(selected_category_names):
                         if os.path.exists(f'../data/temp_{category}'):
                             shutil.rmtree(f'../data/temp_{category}')